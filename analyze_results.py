@@ -4,7 +4,7 @@ from datetime import datetime
 
 def find_latest_evaluation():
     """Find the most recent evaluation file"""
-    files = [f for f in os.listdir('.') if f.startswith('rag_evaluation_') and f.endswith('.json')]
+    files = [f for f in os.listdir('.') if f.startswith('rag_evaluation_') and f.endswith(('.json', '.jsonl'))]
     if not files:
         return None
     return max(files)
@@ -12,7 +12,12 @@ def find_latest_evaluation():
 def analyze_results(file_path):
     """Analyze evaluation results"""
     with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        if file_path.endswith('.jsonl'):
+            # JSON Lines output: a metadata line followed by one result per line
+            data = json.loads(f.readline())
+            data['results'] = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
     
     results = data['results']
     
@@ -244,8 +244,8 @@ if prompt := st.chat_input(chat_placeholders.get(st.session_state.language, "Ask
                         chat_history, 
                         st.session_state.language
                     )
-                    answer = response["answer"]
-                    references = response["references"]
+                    answer = response.answer
+                    references = response.references
                     
                     # Create a placeholder for the typing animation
                     message_placeholder = st.empty()
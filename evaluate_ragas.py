@@ -1,17 +1,16 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from datasets import Dataset
-from utils import load_vector_store, create_enhanced_rag_response
+from utils import load_vector_store, create_enhanced_rag_response, RAG_CONCURRENCY
+from ragas_cache import evaluate_with_cache
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 # Import RAGAS with proper error handling
 try:
-    from ragas import evaluate
     from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall
     RAGAS_VERSION = "new"
 except ImportError:
-    from ragas import evaluate
     from ragas.metrics import Faithfulness, AnswerRelevancy, ContextPrecision, ContextRecall
     RAGAS_VERSION = "old"
 
@@ -24,9 +23,7 @@ def load_ground_truth(file_path):
 
 def generate_rag_responses(ground_truth_data, retriever):
     """Generate RAG responses for all questions"""
-    results = []
-    
-    for i, item in enumerate(ground_truth_data, 1):
+    def _one(i, item):
         question = item['question']
         ground_truth = item['answer']
         
@@ -34,20 +31,17 @@ def generate_rag_responses(ground_truth_data, retriever):
         
         # Get RAG response
         response = create_enhanced_rag_response(retriever, question, "", "English")
-        answer = response['answer']
-        
-        # Get contexts from retriever
-        retrieved_docs = retriever.invoke(question)
-        contexts = [doc.page_content for doc in retrieved_docs]
         
-        results.append({
+        return {
             'question': question,
-            'answer': answer,
-            'contexts': contexts,
+            'answer': response.answer,
+            'contexts': response.contexts,
             'ground_truth': ground_truth
-        })
+        }
     
-    return results
+    # I/O-bound calls run on a thread pool; map preserves question order
+    with ThreadPoolExecutor(max_workers=RAG_CONCURRENCY) as executor:
+        return list(executor.map(_one, range(1, len(ground_truth_data) + 1), ground_truth_data))
 
 def main():
     print("=" * 60)
@@ -71,19 +65,18 @@ def main():
     results = generate_rag_responses(ground_truth_data, retriever)
     print("✓ All responses generated")
     
-    # Create dataset for RAGAS
     print("\n[4/4] Running RAGAS evaluation...")
-    dataset = Dataset.from_list(results)
     
     # Evaluate with RAGAS metrics - use the correct format
+    # Judge scores for unchanged rows are reused from the on-disk cache
     if RAGAS_VERSION == "new":
-        evaluation_result = evaluate(
-            dataset,
+        evaluation_result = evaluate_with_cache(
+            results,
             metrics=[faithfulness, answer_relevancy, context_precision, context_recall]
         )
     else:
-        evaluation_result = evaluate(
-            dataset,
+        evaluation_result = evaluate_with_cache(
+            results,
             metrics=[Faithfulness(), AnswerRelevancy(), ContextPrecision(), ContextRecall()],
             llm=ChatOpenAI(model="gpt-4o-mini"),
             embeddings=OpenAIEmbeddings()
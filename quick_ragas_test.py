@@ -56,16 +56,16 @@ def quick_ragas_test():
             retrieved_docs = retriever.invoke(question)
             contexts = [doc.page_content[:200] + "..." for doc in retrieved_docs]
             
-            print(f"Generated Answer: {rag_response['answer'][:150]}...")
+            print(f"Generated Answer: {rag_response.answer[:150]}...")
             print(f"Retrieved {len(contexts)} context chunks")
-            print(f"References: {len(rag_response.get('references', []))}")
+            print(f"References: {len(rag_response.references)}")
             
             results.append({
                 'question': question,
                 'ground_truth': ground_truth,
-                'generated_answer': rag_response['answer'],
+                'generated_answer': rag_response.answer,
                 'contexts': contexts,
-                'references': rag_response.get('references', []),
+                'references': rag_response.references,
                 'case_name': case_name
             })
             
@@ -0,0 +1,131 @@
+"""
+Disk-backed memoization of RAGAS judge scores
+Rows whose (question, answer, contexts, ground_truth, metric) tuple was already
+scored in a previous run are read from the cache instead of re-running the LLM judge
+"""
+
+import hashlib
+import json
+import math
+import os
+from operator import itemgetter
+from typing import List, Dict
+
+import pandas as pd
+import pyarrow as pa
+from datasets import Dataset
+from ragas import evaluate
+
+from utils import open_disk_cache
+
+RAGAS_CACHE_DIR = os.path.join(".cache", "ragas_judge")
+INPUT_COLUMNS = ("question", "answer", "contexts", "ground_truth")
+ARROW_TYPES = {
+    "question": pa.string(),
+    "answer": pa.string(),
+    "contexts": pa.list_(pa.string()),
+    "ground_truth": pa.string(),
+}
+
+
+class CachedEvaluationResult:
+    """Minimal stand-in for the RAGAS EvaluationResult built from cached and fresh scores"""
+
+    def __init__(self, df: pd.DataFrame, metric_names: List[str]):
+        self._df = df
+        self._metric_names = metric_names
+
+    def to_pandas(self) -> pd.DataFrame:
+        return self._df.copy()
+
+    def keys(self):
+        return list(self._metric_names)
+
+    def __getitem__(self, metric_name: str) -> float:
+        return float(self._df[metric_name].mean())
+
+
+def to_dataset(columns: Dict[str, list]) -> Dataset:
+    """Build a HF Dataset from typed Arrow arrays, skipping from_dict's schema inference"""
+    table = pa.table({
+        name: pa.array(values, type=ARROW_TYPES.get(name)) for name, values in columns.items()
+    })
+    return Dataset(table)
+
+
+def _transpose(rows: List[Dict], columns: List[str]) -> Dict[str, list]:
+    """Turn row dicts into {column: values} with one itemgetter/zip pass over the rows"""
+    if not rows or not columns:
+        return {column: [] for column in columns}
+    get = itemgetter(*columns)
+    try:
+        if len(columns) == 1:
+            return {columns[0]: list(map(get, rows))}
+        return dict(zip(columns, map(list, zip(*map(get, rows)))))
+    except KeyError:
+        # Some rows lack a column (e.g. no ground_truth); those cells become None
+        return {column: [row.get(column) for row in rows] for column in columns}
+
+
+def _metric_name(metric) -> str:
+    return getattr(metric, "name", None) or type(metric).__name__
+
+
+def judge_cache_key(row: Dict, metric_name: str) -> str:
+    """Stable hash of one evaluation row and metric"""
+    payload = json.dumps(
+        [row.get(column, "") for column in INPUT_COLUMNS] + [metric_name],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def evaluate_with_cache(rows: List[Dict], metrics: list, cache_dir: str = RAGAS_CACHE_DIR, **evaluate_kwargs):
+    """
+    Run RAGAS evaluate only on rows that have uncached metric scores
+
+    Args:
+        rows: List of dicts with question, answer, contexts and (optionally) ground_truth
+        metrics: RAGAS metrics passed through to evaluate
+        cache_dir: Directory of the persistent judge cache
+        **evaluate_kwargs: Extra arguments for evaluate (llm, embeddings, ...)
+
+    Returns:
+        CachedEvaluationResult with one score column per metric
+    """
+    metric_names = [_metric_name(metric) for metric in metrics]
+    columns = [column for column in INPUT_COLUMNS if any(column in row for row in rows)]
+    scores = {name: [math.nan] * len(rows) for name in metric_names}
+
+    with open_disk_cache(cache_dir) as cache:
+        pending = []
+        for i, row in enumerate(rows):
+            for name in metric_names:
+                key = judge_cache_key(row, name)
+                if key in cache:
+                    scores[name][i] = cache[key]
+            if any(math.isnan(scores[name][i]) for name in metric_names):
+                pending.append(i)
+
+        print(f"[*] RAGAS judge cache: {len(rows) - len(pending)}/{len(rows)} rows cached, "
+              f"{len(pending)} to evaluate")
+
+        if pending:
+            dataset = to_dataset(_transpose([rows[i] for i in pending], columns))
+            fresh_df = evaluate(dataset, metrics=metrics, **evaluate_kwargs).to_pandas()
+
+            for name in metric_names:
+                if name not in fresh_df.columns:
+                    continue
+                for i, score in zip(pending, fresh_df[name].tolist()):
+                    if score is None or pd.isna(score):
+                        continue
+                    scores[name][i] = float(score)
+                    # Failed judgments (NaN) are left uncached so they are retried next run
+                    cache[judge_cache_key(rows[i], name)] = float(score)
+
+    df = pd.DataFrame(_transpose(rows, columns))
+    for name in metric_names:
+        df[name] = scores[name]
+
+    return CachedEvaluationResult(df, metric_names)
@@ -3,15 +3,15 @@ Comprehensive RAGAS Evaluation Script for Legal Chatbot
 Evaluates RAG system performance using IndicLegalQA dataset with multiple metrics
 """
 
-import json
+import asyncio
 import os
 from datetime import datetime
 from typing import List, Dict
 import pandas as pd
-from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 
 # RAGAS imports
-from ragas import evaluate
+from ragas.run_config import RunConfig
 from ragas.metrics import (
     faithfulness,
     answer_relevancy,
@@ -19,10 +19,23 @@ from ragas.metrics import (
     context_recall,
     answer_correctness
 )
-from datasets import Dataset
 
 # Local imports
-from utils import load_vector_store, create_enhanced_rag_response
+from ragas_cache import evaluate_with_cache
+from utils import (
+    load_vector_store,
+    load_json_sample,
+    write_json,
+    to_json_line,
+    read_jsonl,
+    get_cached_openai_embeddings,
+    enable_llm_cache,
+    acreate_enhanced_rag_response,
+    rag_response_cache_key,
+    get_rate_limiter,
+    get_openai_async_http_client,
+    RAG_CONCURRENCY
+)
 from langchain_openai import ChatOpenAI
 
 class RAGASEvaluator:
@@ -48,10 +61,29 @@ class RAGASEvaluator:
         # Load vector store
         print("[*] Loading vector store...")
         vector_store = load_vector_store()
-        self.retriever = vector_store.as_retriever(search_kwargs={"k": 5})
-        
-        # Initialize LLM for evaluation
-        self.llm = ChatOpenAI(model="gpt-4o-mini")
+        # MMR re-ranks a wider candidate pool down to k diverse chunks, keeping judge contexts tight
+        self.retriever = vector_store.as_retriever(search_type="mmr", search_kwargs={"k": 5, "fetch_k": 20})
+        
+        # Generated responses are appended here as they complete, so an interrupted run can resume.
+        # The name carries the retriever settings and RAG_RESPONSE_CACHE_VERSION, so answers from a
+        # different retrieval setup or prompt are never picked up; the file is removed once complete.
+        settings_key = rag_response_cache_key(self.retriever, question="")[:12]
+        self.responses_path = os.path.join(
+            self.results_dir, f"rag_responses_n{sample_size}_{settings_key}.jsonl"
+        )
+        
+        # Initialize LLM for evaluation; retries absorb transient 429s under concurrent judging
+        self.llm = ChatOpenAI(
+            model="gpt-4o-mini",
+            max_retries=5,
+            request_timeout=60,
+            # RAGAS judges asynchronously; reuse pooled connections instead of a handshake per call
+            http_async_client=get_openai_async_http_client()
+        )
+        self.run_config = RunConfig(max_workers=32, timeout=180, max_retries=5)
+        
+        # Disk-cached embeddings so reruns don't re-embed questions, answers and contexts
+        self.embeddings = get_cached_openai_embeddings()
         
         print(f"[OK] Initialized evaluator with sample size: {sample_size}")
     
@@ -59,59 +91,89 @@ class RAGASEvaluator:
         """Load and sample the IndicLegalQA dataset"""
         print(f"[*] Loading dataset from {self.dataset_path}...")
         
-        with open(self.dataset_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        print(f"[OK] Loaded {len(data)} total records")
-        
-        # Sample the dataset
-        import random
-        random.seed(42)  # For reproducibility
-        sampled_data = random.sample(data, min(self.sample_size, len(data)))
+        # Stream and reservoir-sample the dataset (seeded for reproducibility)
+        sampled_data = load_json_sample(self.dataset_path, self.sample_size, seed=42)
         
         print(f"[*] Sampled {len(sampled_data)} questions for evaluation")
         return sampled_data
     
-    def generate_rag_responses(self, questions_data: List[Dict]) -> List[Dict]:
+    async def generate_rag_responses_async(self, questions_data: List[Dict]) -> List[Dict]:
         """
-        Generate RAG responses for all questions
+        Generate RAG responses for all questions concurrently
         
         Returns:
             List of dicts with question, answer, contexts, ground_truth
         """
         print("\n[*] Generating RAG responses...")
         
-        evaluation_data = []
-        
-        for item in tqdm(questions_data, desc="Processing questions", ascii=True):
+        # Resume from responses already streamed by an earlier, interrupted run
+        completed = {}
+        if os.path.exists(self.responses_path):
+            completed = {row["question"]: row for row in read_jsonl(self.responses_path)}
+            print(f"[*] Resuming: {len(completed)} responses found in {self.responses_path}")
+        pending = [item for item in questions_data if item['question'] not in completed]
+        
+        # Bound in-flight OpenAI/vector store calls
+        semaphore = asyncio.Semaphore(RAG_CONCURRENCY)
+        # ...and keep their rate under OPENAI_RPM
+        rate_limiter = get_rate_limiter()
+        
+        # Retrieve once for the whole sample; the same documents feed both the answer and the contexts
+        all_docs = await self.retriever.abatch(
+            [item['question'] for item in pending],
+            config={"max_concurrency": RAG_CONCURRENCY},
+            return_exceptions=True
+        ) if pending else []
+        
+        async def _one(item: Dict, retrieved_docs):
             question = item['question']
             ground_truth = item['answer']
             
-            try:
-                # Get RAG response with context
-                response = create_enhanced_rag_response(
-                    retriever=self.retriever,
-                    question=question,
-                    chat_history="",
-                    language="English"
-                )
-                
-                # Get retrieved documents for context
-                retrieved_docs = self.retriever.invoke(question)
-                contexts = [doc.page_content for doc in retrieved_docs]
-                
-                evaluation_data.append({
-                    "question": question,
-                    "answer": response["answer"],
-                    "contexts": contexts,
-                    "ground_truth": ground_truth,
-                    "case_name": item.get('case_name', 'Unknown'),
-                    "judgement_date": item.get('judgement_date', 'Unknown')
-                })
-                
-            except Exception as e:
-                print(f"\n[WARNING] Error processing question: {question[:50]}... Error: {e}")
-                continue
+            async with rate_limiter, semaphore:
+                try:
+                    if isinstance(retrieved_docs, Exception):
+                        raise retrieved_docs
+                    
+                    # Get RAG response with context
+                    response = await acreate_enhanced_rag_response(
+                        retriever=self.retriever,
+                        question=question,
+                        chat_history="",
+                        language="English",
+                        retrieved_docs=retrieved_docs
+                    )
+                    
+                    row = {
+                        "question": question,
+                        "answer": response.answer,
+                        "contexts": response.contexts,
+                        "ground_truth": ground_truth,
+                        "case_name": item.get('case_name', 'Unknown'),
+                        "judgement_date": item.get('judgement_date', 'Unknown')
+                    }
+                    responses_file.write(to_json_line(row))
+                    responses_file.flush()
+                    completed[question] = row
+                    
+                except Exception as e:
+                    print(f"\n[WARNING] Error processing question: {question[:50]}... Error: {e}")
+        
+        with open(self.responses_path, 'ab') as responses_file:
+            await tqdm_asyncio.gather(
+                *(_one(item, docs) for item, docs in zip(pending, all_docs)),
+                desc="Processing questions",
+                ascii=True
+            )
+        
+        # Keep the sampled question order
+        evaluation_data = [completed[item['question']] for item in questions_data if item['question'] in completed]
+        
+        # The resume file is only for interrupted runs; once every question is answered it goes away
+        if len(evaluation_data) == len(questions_data):
+            os.remove(self.responses_path)
+        else:
+            print(f"[*] {len(questions_data) - len(evaluation_data)} questions failed; "
+                  f"rerun to retry them (progress kept in {self.responses_path})")
         
         print(f"\n[OK] Generated {len(evaluation_data)} responses successfully")
         return evaluation_data
@@ -128,22 +190,17 @@ class RAGASEvaluator:
         """
         print("\n[*] Running RAGAS evaluation...")
         
-        # Convert to RAGAS dataset format
-        dataset_dict = {
-            "question": [item["question"] for item in evaluation_data],
-            "answer": [item["answer"] for item in evaluation_data],
-            "contexts": [item["contexts"] for item in evaluation_data],
-            "ground_truth": [item["ground_truth"] for item in evaluation_data]
-        }
-        
-        dataset = Dataset.from_dict(dataset_dict)
-        
         # Run evaluation with all metrics
         print("[*] Calculating metrics (this may take several minutes)...")
         
+        # Memoize identical judge prompts across runs
+        enable_llm_cache()
+        
         try:
-            result = evaluate(
-                dataset,
+            # Rows already scored in a previous run are served from the judge cache,
+            # so only new or changed rows reach evaluate
+            result = evaluate_with_cache(
+                evaluation_data,
                 metrics=[
                     faithfulness,
                     answer_relevancy,
@@ -151,7 +208,10 @@ class RAGASEvaluator:
                     context_recall,
                     answer_correctness
                 ],
-                llm=self.llm
+                llm=self.llm,
+                embeddings=self.embeddings,
+                run_config=self.run_config,
+                raise_exceptions=False
             )
             
             print("\n[OK] RAGAS evaluation completed!")
@@ -163,64 +223,62 @@ class RAGASEvaluator:
     
     def save_results(self, evaluation_data: List[Dict], ragas_results: Dict) -> str:
         """
-        Save detailed results to JSON file
+        Save per-question results to a JSON Lines file and the overall metrics to JSON
         
         Returns:
             Path to saved results file
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         results_file = os.path.join(self.results_dir, f"ragas_evaluation_{timestamp}.json")
-        
-        # Combine evaluation data with RAGAS scores
-        detailed_results = []
+        detailed_file = os.path.join(self.results_dir, f"ragas_detailed_{timestamp}.jsonl")
         
         # Convert ragas_results to DataFrame for easier access
         results_df = ragas_results.to_pandas()
+        metric_cols = [metric for metric in ragas_results.keys() if metric in results_df.columns]
+        overall_metrics = {
+            metric: float(score) for metric, score in results_df[metric_cols].mean().items()
+        }
         
-        for i, item in enumerate(evaluation_data):
-            detailed_results.append({
-                "question": item["question"],
-                "answer": item["answer"],
-                "ground_truth": item["ground_truth"],
-                "case_name": item["case_name"],
-                "judgement_date": item["judgement_date"],
-                "contexts": item["contexts"],
-                "metrics": {
-                    "faithfulness": float(results_df.iloc[i]["faithfulness"]) if "faithfulness" in results_df.columns else None,
-                    "answer_relevancy": float(results_df.iloc[i]["answer_relevancy"]) if "answer_relevancy" in results_df.columns else None,
-                    "context_precision": float(results_df.iloc[i]["context_precision"]) if "context_precision" in results_df.columns else None,
-                    "context_recall": float(results_df.iloc[i]["context_recall"]) if "context_recall" in results_df.columns else None,
-                    "answer_correctness": float(results_df.iloc[i]["answer_correctness"]) if "answer_correctness" in results_df.columns else None
-                }
-            })
-        
-        # Save to JSON
-        output = {
+        # Small summary files go to disk first, before the per-question stream
+        summary_file = os.path.join(self.results_dir, f"metrics_summary_{timestamp}.json")
+        write_json(summary_file, {
             "timestamp": timestamp,
             "sample_size": len(evaluation_data),
-            "overall_metrics": {
-                metric: float(ragas_results[metric]) for metric in ragas_results.keys()
-            },
-            "detailed_results": detailed_results
-        }
-        
-        with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n[OK] Detailed results saved to: {results_file}")
+            "metrics": overall_metrics
+        })
+        print(f"\n[OK] Summary saved to: {summary_file}")
         
-        # Also save summary
-        summary_file = os.path.join(self.results_dir, f"metrics_summary_{timestamp}.json")
-        summary = {
+        write_json(results_file, {
             "timestamp": timestamp,
             "sample_size": len(evaluation_data),
-            "metrics": output["overall_metrics"]
+            "overall_metrics": overall_metrics,
+            "detailed_results_file": os.path.basename(detailed_file)
+        })
+        print(f"[OK] Results saved to: {results_file}")
+        
+        # Pull each metric column out once as a NumPy array instead of per-cell .iloc lookups
+        metric_arrays = {
+            metric: results_df[metric].to_numpy() if metric in results_df.columns else None
+            for metric in ("faithfulness", "answer_relevancy", "context_precision", "context_recall", "answer_correctness")
         }
         
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
-        
-        print(f"[OK] Summary saved to: {summary_file}")
+        # Stream each row joined with its RAGAS scores instead of building one large list
+        with open(detailed_file, 'wb') as f:
+            for i, item in enumerate(evaluation_data):
+                f.write(to_json_line({
+                    "question": item["question"],
+                    "answer": item["answer"],
+                    "ground_truth": item["ground_truth"],
+                    "case_name": item["case_name"],
+                    "judgement_date": item["judgement_date"],
+                    "contexts": item["contexts"],
+                    "metrics": {
+                        metric: None if values is None else float(values[i])
+                        for metric, values in metric_arrays.items()
+                    }
+                }))
+        
+        print(f"[OK] Per-question results saved to: {detailed_file}")
         
         return results_file
     
@@ -232,7 +290,9 @@ class RAGASEvaluator:
         
         # Convert to dict if it's an EvaluationResult object
         if hasattr(ragas_results, 'to_pandas'):
-            results_dict = ragas_results.to_pandas().mean().to_dict()
+            df = ragas_results.to_pandas()
+            metric_cols = [c for c in df.columns if c not in {"question", "answer", "contexts", "ground_truth"}]
+            results_dict = df[metric_cols].apply(pd.to_numeric, errors='coerce').mean().dropna().to_dict()
         else:
             results_dict = ragas_results
         
@@ -264,7 +324,7 @@ def main(sample_size: int = 100, test_mode: bool = False):
     questions_data = evaluator.load_dataset()
     
     # Generate RAG responses
-    evaluation_data = evaluator.generate_rag_responses(questions_data)
+    evaluation_data = asyncio.run(evaluator.generate_rag_responses_async(questions_data))
     
     if len(evaluation_data) == 0:
         print("[ERROR] No evaluation data generated. Exiting.")
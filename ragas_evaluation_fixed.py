@@ -1,20 +1,87 @@
-import json
-import pandas as pd
+import asyncio
+import itertools
 import os
+import pandas as pd
 from typing import List, Dict
-from datasets import Dataset
 from ragas import evaluate
+from ragas.run_config import RunConfig
 from ragas.metrics.collections import (
     answer_relevancy,
     faithfulness,
     context_recall,
     context_precision
 )
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from utils import load_vector_store, create_enhanced_rag_response
-import time
+from langchain_openai import ChatOpenAI
+from ragas_cache import to_dataset
+from utils import (
+    load_vector_store,
+    load_json_sample,
+    write_json,
+    get_cached_openai_embeddings,
+    enable_llm_cache,
+    acreate_enhanced_rag_response,
+    get_rate_limiter,
+    get_openai_async_http_client,
+    RAG_CONCURRENCY
+)
 from datetime import datetime
 
+RESULT_COLUMNS = ('question', 'answer', 'contexts', 'ground_truth', 'case_name')
+
+async def generate_rag_results(retriever, test_data: List[Dict]) -> Dict[str, list]:
+    """Generate RAG responses for all test questions concurrently"""
+    semaphore = asyncio.Semaphore(RAG_CONCURRENCY)
+    rate_limiter = get_rate_limiter()
+    
+    # Columnar results, filled in place by position
+    n = len(test_data)
+    columns = {name: [None] * n for name in RESULT_COLUMNS}
+    succeeded = [False] * n
+    
+    # One batched retrieval pass instead of two retriever calls per question
+    all_docs = await retriever.abatch(
+        [item['question'] for item in test_data],
+        config={"max_concurrency": RAG_CONCURRENCY},
+        return_exceptions=True
+    )
+    
+    async def _one(i: int, item: Dict, retrieved_docs):
+        async with rate_limiter, semaphore:
+            try:
+                if isinstance(retrieved_docs, Exception):
+                    raise retrieved_docs
+                
+                question = item['question']
+                ground_truth = item['answer']
+                case_name = item.get('case_name', 'Unknown Case')
+                
+                print(f"Processing {i+1}/{len(test_data)}: {question[:50]}...")
+                
+                # Generate RAG response
+                rag_response = await acreate_enhanced_rag_response(
+                    retriever=retriever,
+                    question=question,
+                    chat_history="",
+                    language="English",
+                    retrieved_docs=retrieved_docs
+                )
+                
+                columns['question'][i] = question
+                columns['answer'][i] = rag_response.answer
+                columns['contexts'][i] = rag_response.contexts
+                columns['ground_truth'][i] = ground_truth
+                columns['case_name'][i] = case_name
+                succeeded[i] = True
+                
+            except Exception as e:
+                print(f"Error processing question {i+1}: {e}")
+    
+    await asyncio.gather(
+        *(_one(i, item, docs) for i, (item, docs) in enumerate(zip(test_data, all_docs)))
+    )
+    # Drop the slots of questions that failed
+    return {name: list(itertools.compress(values, succeeded)) for name, values in columns.items()}
+
 def run_ragas_evaluation_fixed():
     """Fixed RAGAS evaluation that handles the new API properly"""
     print("🚀 Starting Legal RAG System RAGAS Evaluation (Fixed Version)")
@@ -25,10 +92,8 @@ def run_ragas_evaluation_fixed():
     sample_size = 10  # Smaller sample for reliability
     
     try:
-        with open(test_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        test_data = data[:sample_size]
-        print(f"✅ Loaded {len(test_data)} test cases from {len(data)} total cases")
+        test_data = load_json_sample(test_data_path, sample_size)
+        print(f"✅ Loaded {len(test_data)} test cases")
     except Exception as e:
         print(f"❌ Error loading test data: {e}")
         return
@@ -36,7 +101,8 @@ def run_ragas_evaluation_fixed():
     # Setup RAG system
     try:
         vector_store = load_vector_store()
-        retriever = vector_store.as_retriever(search_kwargs={"k": 3})
+        # MMR over 20 candidates for less redundant contexts
+        retriever = vector_store.as_retriever(search_type="mmr", search_kwargs={"k": 3, "fetch_k": 20})
         print("✅ RAG system setup complete")
     except Exception as e:
         print(f"❌ Error setting up RAG system: {e}")
@@ -44,62 +110,30 @@ def run_ragas_evaluation_fixed():
     
     # Generate RAG responses
     print(f"Generating RAG responses for {len(test_data)} questions...")
-    rag_results = []
+    rag_results = asyncio.run(generate_rag_results(retriever, test_data))
+    num_results = len(rag_results['question'])
     
-    for i, item in enumerate(test_data):
-        try:
-            question = item['question']
-            ground_truth = item['answer']
-            case_name = item.get('case_name', 'Unknown Case')
-            
-            print(f"Processing {i+1}/{len(test_data)}: {question[:50]}...")
-            
-            # Generate RAG response
-            rag_response = create_enhanced_rag_response(
-                retriever=retriever,
-                question=question,
-                chat_history="",
-                language="English"
-            )
-            
-            # Extract contexts from retrieved documents
-            retrieved_docs = retriever.invoke(question)
-            contexts = [doc.page_content for doc in retrieved_docs]
-            
-            result = {
-                'question': question,
-                'answer': rag_response['answer'],
-                'contexts': contexts,
-                'ground_truth': ground_truth,
-                'case_name': case_name
-            }
-            
-            rag_results.append(result)
-            time.sleep(0.1)  # Small delay
-            
-        except Exception as e:
-            print(f"Error processing question {i+1}: {e}")
-            continue
+    print(f"✅ Generated {num_results} RAG responses")
     
-    print(f"✅ Generated {len(rag_results)} RAG responses")
-    
-    if not rag_results:
+    if not num_results:
         print("❌ No RAG results generated. Exiting.")
         return
     
     # Prepare dataset for RAGAS
-    dataset_dict = {
-        'question': [item['question'] for item in rag_results],
-        'answer': [item['answer'] for item in rag_results],
-        'contexts': [item['contexts'] for item in rag_results],
-        'ground_truth': [item['ground_truth'] for item in rag_results]
-    }
-    
-    dataset = Dataset.from_dict(dataset_dict)
+    dataset = to_dataset({
+        column: rag_results[column] for column in ('question', 'answer', 'contexts', 'ground_truth')
+    })
     
     # Setup LLM and embeddings
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    embeddings = OpenAIEmbeddings()
+    llm = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+        max_retries=5,
+        request_timeout=60,
+        http_async_client=get_openai_async_http_client()
+    )
+    embeddings = get_cached_openai_embeddings()
+    enable_llm_cache()
     
     # Define metrics (initialize as objects)
     metrics = [
@@ -116,7 +150,9 @@ def run_ragas_evaluation_fixed():
             dataset=dataset,
             metrics=metrics,
             llm=llm,
-            embeddings=embeddings
+            embeddings=embeddings,
+            run_config=RunConfig(max_workers=32, timeout=180, max_retries=5),
+            raise_exceptions=False
         )
         
         print("✅ RAGAS evaluation completed")
@@ -129,13 +165,11 @@ def run_ragas_evaluation_fixed():
             print("=" * 60)
             
             # Calculate and display metrics
-            metrics_summary = {}
-            for column in df.columns:
-                if column not in ['question', 'answer', 'contexts', 'ground_truth']:
-                    score = df[column].mean()
-                    if not pd.isna(score):
-                        metrics_summary[column] = float(score)
-                        print(f"{column.upper()}: {score:.4f}")
+            metric_columns = [c for c in df.columns if c not in ('question', 'answer', 'contexts', 'ground_truth')]
+            metric_means = df[metric_columns].apply(pd.to_numeric, errors='coerce').mean().dropna()
+            metrics_summary = {column: float(score) for column, score in metric_means.items()}
+            for column, score in metrics_summary.items():
+                print(f"{column.upper()}: {score:.4f}")
             
             # Save detailed results
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -146,13 +180,14 @@ def run_ragas_evaluation_fixed():
             # Save summary
             summary = {
                 'evaluation_date': datetime.now().isoformat(),
-                'total_questions': len(rag_results),
+                'total_questions': num_results,
                 'metrics': metrics_summary,
-                'sample_results': rag_results[:3]  # First 3 for inspection
+                'sample_results': [  # First 3 for inspection
+                    dict(zip(rag_results, row)) for row in itertools.islice(zip(*rag_results.values()), 3)
+                ]
             }
             
-            with open(f"ragas_summary_{timestamp}.json", 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            write_json(f"ragas_summary_{timestamp}.json", summary)
             
             print(f"\n✅ Results saved:")
             print(f"  - Detailed: ragas_results_{timestamp}.csv")
@@ -167,7 +202,7 @@ def run_ragas_evaluation_fixed():
                 interpretation = interpret_score(metric, score)
                 print(f"{metric}: {interpretation}")
             
-            print(f"\nTotal Questions Evaluated: {len(rag_results)}")
+            print(f"\nTotal Questions Evaluated: {num_results}")
             print("Evaluation completed successfully! 🎉")
             
         else:
@@ -1,15 +1,81 @@
-import json
+import asyncio
+import itertools
 import pandas as pd
 import os
 from typing import List, Dict
-from datasets import Dataset
 from ragas import evaluate
+from ragas.run_config import RunConfig
 from ragas.metrics.collections import faithfulness, answer_relevancy
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from utils import load_vector_store, create_enhanced_rag_response
-import time
+from langchain_openai import ChatOpenAI
+from ragas_cache import to_dataset
+from utils import (
+    load_vector_store,
+    load_json_sample,
+    write_json,
+    get_cached_openai_embeddings,
+    enable_llm_cache,
+    acreate_enhanced_rag_response,
+    get_rate_limiter,
+    get_openai_async_http_client,
+    RAG_CONCURRENCY
+)
 from datetime import datetime
 
+RESULT_COLUMNS = ('question', 'answer', 'contexts', 'case_name', 'references_count')
+
+async def generate_rag_results(retriever, test_data: List[Dict]) -> Dict[str, list]:
+    """Generate RAG responses concurrently (ground truth is not needed here)"""
+    semaphore = asyncio.Semaphore(RAG_CONCURRENCY)
+    rate_limiter = get_rate_limiter()
+    
+    # One preallocated list per output column; workers write their own index
+    n = len(test_data)
+    columns = {name: [None] * n for name in RESULT_COLUMNS}
+    succeeded = [False] * n
+    
+    # One batched retrieval pass instead of two retriever calls per question
+    all_docs = await retriever.abatch(
+        [item['question'] for item in test_data],
+        config={"max_concurrency": RAG_CONCURRENCY},
+        return_exceptions=True
+    )
+    
+    async def _one(i: int, item: Dict, retrieved_docs):
+        async with rate_limiter, semaphore:
+            try:
+                if isinstance(retrieved_docs, Exception):
+                    raise retrieved_docs
+                
+                question = item['question']
+                case_name = item.get('case_name', 'Unknown Case')
+                
+                print(f"Processing {i+1}/{len(test_data)}: {question[:50]}...")
+                
+                # Generate RAG response
+                rag_response = await acreate_enhanced_rag_response(
+                    retriever=retriever,
+                    question=question,
+                    chat_history="",
+                    language="English",
+                    retrieved_docs=retrieved_docs
+                )
+                
+                columns['question'][i] = question
+                columns['answer'][i] = rag_response.answer
+                columns['contexts'][i] = rag_response.contexts
+                columns['case_name'][i] = case_name
+                columns['references_count'][i] = len(rag_response.references)
+                succeeded[i] = True
+                
+            except Exception as e:
+                print(f"Error processing question {i+1}: {e}")
+    
+    await asyncio.gather(
+        *(_one(i, item, docs) for i, (item, docs) in enumerate(zip(test_data, all_docs)))
+    )
+    # Drop the slots of questions that failed
+    return {name: list(itertools.compress(values, succeeded)) for name, values in columns.items()}
+
 def ragas_without_ground_truth():
     """RAGAS evaluation focusing on faithfulness and answer relevancy without ground truth"""
     print("🚀 RAGAS Evaluation - No Ground Truth Required")
@@ -20,9 +86,7 @@ def ragas_without_ground_truth():
     sample_size = 8  # Small sample for reliability
     
     try:
-        with open(test_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        test_data = data[:sample_size]
+        test_data = load_json_sample(test_data_path, sample_size)
         print(f"✅ Loaded {len(test_data)} test questions (ignoring ground truth)")
     except Exception as e:
         print(f"❌ Error loading test data: {e}")
@@ -31,7 +95,7 @@ def ragas_without_ground_truth():
     # Setup RAG system
     try:
         vector_store = load_vector_store()
-        retriever = vector_store.as_retriever(search_kwargs={"k": 4})
+        retriever = vector_store.as_retriever(search_type="mmr", search_kwargs={"k": 4, "fetch_k": 20})
         print("✅ RAG system setup complete")
     except Exception as e:
         print(f"❌ Error setting up RAG system: {e}")
@@ -39,60 +103,28 @@ def ragas_without_ground_truth():
     
     # Generate RAG responses
     print(f"Generating RAG responses for {len(test_data)} questions...")
-    rag_results = []
-    
-    for i, item in enumerate(test_data):
-        try:
-            question = item['question']
-            case_name = item.get('case_name', 'Unknown Case')
-            
-            print(f"Processing {i+1}/{len(test_data)}: {question[:50]}...")
-            
-            # Generate RAG response
-            rag_response = create_enhanced_rag_response(
-                retriever=retriever,
-                question=question,
-                chat_history="",
-                language="English"
-            )
-            
-            # Extract contexts from retrieved documents
-            retrieved_docs = retriever.invoke(question)
-            contexts = [doc.page_content for doc in retrieved_docs]
-            
-            result = {
-                'question': question,
-                'answer': rag_response['answer'],
-                'contexts': contexts,
-                'case_name': case_name,
-                'references_count': len(rag_response.get('references', []))
-            }
-            
-            rag_results.append(result)
-            time.sleep(0.2)  # Rate limiting
-            
-        except Exception as e:
-            print(f"Error processing question {i+1}: {e}")
-            continue
+    rag_results = asyncio.run(generate_rag_results(retriever, test_data))
+    num_results = len(rag_results['question'])
     
-    print(f"✅ Generated {len(rag_results)} RAG responses")
+    print(f"✅ Generated {num_results} RAG responses")
     
-    if not rag_results:
+    if not num_results:
         print("❌ No RAG results generated. Exiting.")
         return
     
     # Prepare dataset for RAGAS (without ground truth)
-    dataset_dict = {
-        'question': [item['question'] for item in rag_results],
-        'answer': [item['answer'] for item in rag_results],
-        'contexts': [item['contexts'] for item in rag_results]
-    }
-    
-    dataset = Dataset.from_dict(dataset_dict)
+    dataset = to_dataset({column: rag_results[column] for column in ('question', 'answer', 'contexts')})
     
     # Setup LLM and embeddings
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    embeddings = OpenAIEmbeddings()
+    llm = ChatOpenAI(
+        model="gpt-4o-mini",
+        temperature=0,
+        max_retries=5,
+        request_timeout=60,
+        http_async_client=get_openai_async_http_client()
+    )
+    embeddings = get_cached_openai_embeddings()
+    enable_llm_cache()
     
     print("Running RAGAS evaluation (faithfulness & answer relevancy only)...")
     
@@ -108,7 +140,9 @@ def ragas_without_ground_truth():
             dataset=dataset,
             metrics=metrics,
             llm=llm,
-            embeddings=embeddings
+            embeddings=embeddings,
+            run_config=RunConfig(max_workers=32, timeout=180, max_retries=5),
+            raise_exceptions=False
         )
         
         print("✅ RAGAS evaluation completed")
@@ -126,26 +160,26 @@ def ragas_without_ground_truth():
             print(f"{'='*60}")
             
             # Calculate metrics
-            metrics_summary = {}
-            for column in df.columns:
-                if column not in ['question', 'answer', 'contexts']:
-                    try:
-                        score = pd.to_numeric(df[column], errors='coerce').mean()
-                        if not pd.isna(score):
-                            metrics_summary[column] = float(score)
-                            interpretation = interpret_score(column, float(score))
-                            print(f"{column.upper()}: {score:.4f} - {interpretation}")
-                    except Exception as e:
-                        print(f"Could not process metric {column}: {e}")
+            metric_columns = [c for c in df.columns if c not in ('question', 'answer', 'contexts')]
+            metric_means = df[metric_columns].apply(pd.to_numeric, errors='coerce').mean().dropna()
+            metrics_summary = {column: float(score) for column, score in metric_means.items()}
+            for column, score in metrics_summary.items():
+                interpretation = interpret_score(column, score)
+                print(f"{column.upper()}: {score:.4f} - {interpretation}")
             
             # Additional analysis
             print(f"\n{'='*60}")
             print("SYSTEM ANALYSIS")
             print(f"{'='*60}")
-            print(f"Questions Evaluated: {len(rag_results)}")
-            print(f"Average Answer Length: {sum(len(r['answer']) for r in rag_results) / len(rag_results):.0f} characters")
-            print(f"Average Contexts Retrieved: {sum(len(r['contexts']) for r in rag_results) / len(rag_results):.1f}")
-            print(f"Average References Found: {sum(r['references_count'] for r in rag_results) / len(rag_results):.1f}")
+            # Averages straight off the result columns, reused in the JSON summary below
+            avg_answer_length = sum(map(len, rag_results['answer'])) / num_results
+            avg_contexts_retrieved = sum(map(len, rag_results['contexts'])) / num_results
+            avg_references_found = sum(rag_results['references_count']) / num_results
+            
+            print(f"Questions Evaluated: {num_results}")
+            print(f"Average Answer Length: {avg_answer_length:.0f} characters")
+            print(f"Average Contexts Retrieved: {avg_contexts_retrieved:.1f}")
+            print(f"Average References Found: {avg_references_found:.1f}")
             
             # Save results
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -157,18 +191,19 @@ def ragas_without_ground_truth():
             summary = {
                 'evaluation_date': datetime.now().isoformat(),
                 'evaluation_type': 'RAGAS without ground truth',
-                'total_questions': len(rag_results),
+                'total_questions': num_results,
                 'metrics': metrics_summary,
-                'sample_results': rag_results[:2],  # First 2 for inspection
+                'sample_results': [  # First 2 for inspection
+                    dict(zip(rag_results, row)) for row in itertools.islice(zip(*rag_results.values()), 2)
+                ],
                 'analysis': {
-                    'avg_answer_length': sum(len(r['answer']) for r in rag_results) / len(rag_results),
-                    'avg_contexts_retrieved': sum(len(r['contexts']) for r in rag_results) / len(rag_results),
-                    'avg_references_found': sum(r['references_count'] for r in rag_results) / len(rag_results)
+                    'avg_answer_length': avg_answer_length,
+                    'avg_contexts_retrieved': avg_contexts_retrieved,
+                    'avg_references_found': avg_references_found
                 }
             }
             
-            with open(f"ragas_summary_no_gt_{timestamp}.json", 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            write_json(f"ragas_summary_no_gt_{timestamp}.json", summary)
             
             print(f"\n✅ Results saved:")
             print(f"  - Detailed: ragas_no_ground_truth_{timestamp}.csv")
@@ -205,12 +240,11 @@ def ragas_without_ground_truth():
             print(f"\n{'='*60}")
             print("SAMPLE RESULT")
             print(f"{'='*60}")
-            if rag_results:
-                sample = rag_results[0]
-                print(f"Question: {sample['question']}")
-                print(f"Generated Answer: {sample['answer'][:200]}...")
-                print(f"Contexts Retrieved: {len(sample['contexts'])}")
-                print(f"References Found: {sample['references_count']}")
+            if num_results:
+                print(f"Question: {rag_results['question'][0]}")
+                print(f"Generated Answer: {rag_results['answer'][0][:200]}...")
+                print(f"Contexts Retrieved: {len(rag_results['contexts'][0])}")
+                print(f"References Found: {rag_results['references_count'][0]}")
                 if metrics_summary:
                     scores_text = ", ".join([f"{k}={v:.3f}" for k, v in metrics_summary.items()])
                     print(f"Quality Scores: {scores_text}")
@@ -5,6 +5,20 @@ Simplified interface to run evaluation and generate visualizations
 
 import sys
 import os
+import importlib
+import threading
+
+# Heavy modules (ragas, langchain, pandas, matplotlib) used after the prompt
+HEAVY_MODULES = ("ragas_evaluation_comprehensive", "visualize_ragas_results", "matplotlib.pyplot", "seaborn")
+
+def preload_modules():
+    """Import the evaluation modules in the background while the user is answering the prompt"""
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # The import in main() is retried and reports the error properly
+            pass
 
 def print_banner():
     """Print welcome banner"""
@@ -16,6 +30,8 @@ def main():
     """Main execution"""
     print_banner()
     
+    threading.Thread(target=preload_modules, daemon=True).start()
+    
     print("This script will:")
     print("  1. Load the IndicLegalQA dataset (10,000 Q&A pairs)")
     print("  2. Sample questions for evaluation")
@@ -53,7 +69,7 @@ def main():
     print("STEP 1: Running RAGAS Evaluation")
     print("="*70 + "\n")
     
-    import ragas_evaluation_comprehensive
+    import ragas_evaluation_comprehensive  # already loaded (or loading) by preload_modules
     ragas_evaluation_comprehensive.main(sample_size=sample_size, test_mode=False)
     
     # Generate visualizations
@@ -69,7 +85,7 @@ def main():
     print("="*70)
     print("\n📂 Check the 'evaluation_results' folder for:")
     print("   - Detailed JSON results")
-    print("   - Visualization graphs (PNG)")
+    print("   - Visualization graphs (SVG, heatmap as PNG)")
     print("   - HTML report\n")
 
 if __name__ == "__main__":
@@ -1,12 +1,23 @@
-import json
-from utils import load_vector_store, create_enhanced_rag_response
+import asyncio
+import hashlib
+import numpy as np
+from utils import (
+    load_vector_store,
+    acreate_cached_rag_response,
+    batch_similarity_search,
+    open_disk_cache,
+    RAG_RESPONSE_CACHE_DIR,
+    docs_to_contexts,
+    read_json,
+    to_json_line,
+    RAG_CONCURRENCY
+)
 from datetime import datetime
 
 def load_ground_truth(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return read_json(file_path)
 
-def main():
+async def main():
     print("=" * 60)
     print("Simple RAG Evaluation for Indian Legal Assistant")
     print("=" * 60)
@@ -24,54 +35,116 @@ def main():
     
     # Generate responses
     print("\n[3/3] Generating RAG responses...")
-    results = []
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = f"rag_evaluation_{timestamp}.jsonl"
+    contexts_file = f"rag_contexts_{timestamp}.jsonl"  # Kept outside the rag_evaluation_* pattern analyze_results looks for
+    semaphore = asyncio.Semaphore(RAG_CONCURRENCY)
+    
+    # Only what the summary needs is kept in memory; full records go straight to disk
+    num_contexts = np.zeros(len(ground_truth_data), dtype=np.int32)
+    samples = {}
+    
+    # The same statute passages come back for many questions, so each distinct context text is
+    # written once to contexts_file and results refer to it by digest
+    seen_contexts = set()
+    
+    def put_context(text):
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+        if digest not in seen_contexts:
+            seen_contexts.add(digest)
+            ctx_file.write(to_json_line({"hash": digest, "text": text}))
+        return digest
     
-    for i, item in enumerate(ground_truth_data, 1):
+    # Records are streamed as their questions finish; ones that complete early wait here
+    # until every earlier question has been written, so the file stays in question order
+    waiting = {}
+    next_index = 1
+    
+    def put_record(i, record):
+        nonlocal next_index
+        waiting[i] = record
+        while next_index in waiting:
+            out_file.write(to_json_line(waiting.pop(next_index)))
+            next_index += 1
+        out_file.flush()
+    
+    # One batched embedding pass for every question instead of one per retriever call
+    all_docs = batch_similarity_search(
+        vector_store, (item['question'] for item in ground_truth_data), k=retriever.search_kwargs["k"]
+    )
+    
+    async def process(i, item, retrieved_docs):
         question = item['question']
         ground_truth = item['answer']
         
-        print(f"  [{i}/{len(ground_truth_data)}] {question[:50]}...")
+        if isinstance(retrieved_docs, Exception):
+            # Retrieval failed for this question only; keep its row, with the error, and move on
+            print(f"  [{i}/{len(ground_truth_data)}] Retrieval failed: {retrieved_docs}")
+            put_record(i, {
+                'question': question,
+                'answer': f"Error: {retrieved_docs}",
+                'ground_truth': ground_truth,
+                'context_hashes': [],
+                'num_contexts': 0,
+                'error': str(retrieved_docs)
+            })
+            return
+        
+        async with semaphore:
+            print(f"  [{i}/{len(ground_truth_data)}] {question[:50]}...")
+            
+            response = await acreate_cached_rag_response(
+                rag_cache, retriever, question, "", "English", retrieved_docs=retrieved_docs
+            )
         
-        response = create_enhanced_rag_response(retriever, question, "", "English")
-        answer = response['answer']
-        retrieved_docs = retriever.invoke(question)
-        contexts = [doc.page_content for doc in retrieved_docs]
+        answer = response.answer
+        # Reuse the documents the answer was generated from rather than querying the retriever twice
+        contexts = docs_to_contexts(response.retrieved_docs)
         
-        results.append({
+        record = {
             'question': question,
             'answer': answer,
             'ground_truth': ground_truth,
-            'contexts': contexts,
+            'context_hashes': [put_context(context) for context in contexts],
             'num_contexts': len(contexts)
-        })
-    
-    print("✓ All responses generated")
-    
-    # Save results
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = f"rag_evaluation_{timestamp}.json"
+        }
+        
+        put_record(i, record)
+        
+        num_contexts[i - 1] = len(contexts)
+        if i <= 3:
+            samples[i] = record
     
-    output_data = {
-        "timestamp": timestamp,
-        "total_questions": len(results),
-        "results": results
-    }
+    with open(output_file, 'wb') as out_file, \
+            open(contexts_file, 'wb') as ctx_file, \
+            open_disk_cache(RAG_RESPONSE_CACHE_DIR) as rag_cache:
+        # First line carries the run metadata, each following line is one result
+        out_file.write(to_json_line({
+            "timestamp": timestamp,
+            "total_questions": len(ground_truth_data),
+            "contexts_file": contexts_file
+        }))
+        
+        # Questions are independent, so their LLM and vector store round-trips can overlap
+        await asyncio.gather(
+            *(process(i, item, docs) for i, (item, docs) in enumerate(zip(ground_truth_data, all_docs), 1))
+        )
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    print("✓ All responses generated")
     
     print(f"\n✓ Results saved to: {output_file}")
+    print(f"✓ {len(seen_contexts)} distinct contexts saved to: {contexts_file}")
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    print(f"Total Questions: {len(results)}")
-    print(f"Average Contexts Retrieved: {sum(r['num_contexts'] for r in results) / len(results):.1f}")
+    print(f"Total Questions: {len(ground_truth_data)}")
+    print(f"Average Contexts Retrieved: {num_contexts.mean():.1f}")
     print("\nSample Results (First 3):")
-    for i, r in enumerate(results[:3], 1):
+    for i, r in sorted(samples.items()):
         print(f"\n[{i}] Q: {r['question']}")
         print(f"    Ground Truth: {r['ground_truth']}")
         print(f"    RAG Answer: {r['answer'][:100]}...")
     print("\n" + "=" * 60)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
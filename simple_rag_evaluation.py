@@ -1,9 +1,51 @@
-import json
+import asyncio
 import os
-from utils import load_vector_store, create_enhanced_rag_response
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+import numpy as np
+from utils import (
+    load_vector_store,
+    acreate_cached_rag_response,
+    batch_similarity_search,
+    open_disk_cache,
+    RAG_RESPONSE_CACHE_DIR,
+    load_json_sample,
+    write_json,
+    to_json_line,
+    RAG_CONCURRENCY
+)
 from datetime import datetime
 from langchain_openai import ChatOpenAI
-import time
+from pydantic import BaseModel, Field
+
+# Grading schema returned by the evaluation LLM; the bounds keep scores valid for the int8 matrix
+class Scores(BaseModel):
+    relevancy: int = Field(ge=1, le=10)
+    accuracy: int = Field(ge=1, le=10)
+    completeness: int = Field(ge=1, le=10)
+    explanation: str
+
+# Column order of the per-question score matrix
+SCORE_METRICS = ('relevancy', 'accuracy', 'completeness')
+
+# Answers at least this similar to the ground truth get full marks without an LLM call
+MATCH_THRESHOLD = 0.95
+
+# Fixed grading prompt; only the three per-question fields are filled in at runtime
+EVALUATION_PROMPT = """Evaluate the generated answer against the ground truth for this legal question.
+Rate each aspect from 1-10:
+
+Question: {question}
+Ground Truth: {ground_truth}
+Generated Answer: {generated_answer}
+
+Please rate:
+1. Relevancy (how relevant is the answer to the question): X/10
+2. Accuracy (how factually correct compared to ground truth): X/10
+3. Completeness (how complete is the answer): X/10
+
+Also give a brief explanation of the ratings.
+"""
 
 def simple_rag_evaluation():
     """Simple RAG evaluation without RAGAS dependencies"""
@@ -14,10 +56,13 @@ def simple_rag_evaluation():
     test_data_path = "data/Test_data/IndicLegalQA Dataset_10K_Revised.json"
     sample_size = 5  # Small sample for quick test
     
+    # Reading the test data and loading the vector store are independent, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        test_data_future = executor.submit(load_json_sample, test_data_path, sample_size)
+        vector_store_future = executor.submit(load_vector_store)
+    
     try:
-        with open(test_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        test_data = data[:sample_size]
+        test_data = test_data_future.result()
         print(f"✅ Loaded {len(test_data)} test cases")
     except Exception as e:
         print(f"❌ Error loading test data: {e}")
@@ -25,117 +70,33 @@ def simple_rag_evaluation():
     
     # Setup RAG system
     try:
-        vector_store = load_vector_store()
+        vector_store = vector_store_future.result()
         retriever = vector_store.as_retriever(search_kwargs={"k": 3})
         print("✅ RAG system setup complete")
     except Exception as e:
         print(f"❌ Error setting up RAG system: {e}")
         return
     
-    # Setup LLM for evaluation
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    # Setup LLM for evaluation; structured output returns parsed scores, no text parsing needed
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0).with_structured_output(Scores)
     
-    # Generate and evaluate responses
-    results = []
-    total_scores = {'relevancy': 0, 'accuracy': 0, 'completeness': 0}
+    # Per-question results are written as JSON Lines while grading; only the score matrix stays in memory
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    details_filename = f"simple_rag_evaluation_{timestamp}.jsonl"
     
     print(f"\nEvaluating {len(test_data)} questions...")
+    with open(details_filename, 'wb') as details_file:
+        scores, sample = asyncio.run(
+            evaluate_questions(retriever, llm, test_data, details_file)
+        )
     
-    for i, item in enumerate(test_data):
-        try:
-            question = item['question']
-            ground_truth = item['answer']
-            case_name = item.get('case_name', 'Unknown Case')
-            
-            print(f"\n--- Question {i+1}/{len(test_data)} ---")
-            print(f"Case: {case_name}")
-            print(f"Q: {question}")
-            
-            # Generate RAG response
-            rag_response = create_enhanced_rag_response(
-                retriever=retriever,
-                question=question,
-                chat_history="",
-                language="English"
-            )
-            
-            generated_answer = rag_response['answer']
-            references = rag_response.get('references', [])
-            
-            print(f"Generated Answer: {generated_answer[:150]}...")
-            print(f"Ground Truth: {ground_truth[:150]}...")
-            print(f"References Found: {len(references)}")
-            
-            # Simple evaluation using LLM
-            evaluation_prompt = f"""
-            Evaluate the generated answer against the ground truth for this legal question.
-            Rate each aspect from 1-10:
-
-            Question: {question}
-            Ground Truth: {ground_truth}
-            Generated Answer: {generated_answer}
-
-            Please rate:
-            1. Relevancy (how relevant is the answer to the question): X/10
-            2. Accuracy (how factually correct compared to ground truth): X/10  
-            3. Completeness (how complete is the answer): X/10
-
-            Respond in format:
-            Relevancy: X/10
-            Accuracy: X/10
-            Completeness: X/10
-            Brief explanation: [your explanation]
-            """
-            
-            try:
-                eval_response = llm.invoke(evaluation_prompt)
-                eval_text = eval_response.content
-                
-                # Extract scores
-                relevancy = extract_score(eval_text, "Relevancy")
-                accuracy = extract_score(eval_text, "Accuracy") 
-                completeness = extract_score(eval_text, "Completeness")
-                
-                print(f"Scores - Relevancy: {relevancy}/10, Accuracy: {accuracy}/10, Completeness: {completeness}/10")
-                
-                total_scores['relevancy'] += relevancy
-                total_scores['accuracy'] += accuracy
-                total_scores['completeness'] += completeness
-                
-                results.append({
-                    'question': question,
-                    'ground_truth': ground_truth,
-                    'generated_answer': generated_answer,
-                    'case_name': case_name,
-                    'scores': {
-                        'relevancy': relevancy,
-                        'accuracy': accuracy,
-                        'completeness': completeness
-                    },
-                    'references_count': len(references),
-                    'evaluation': eval_text
-                })
-                
-            except Exception as e:
-                print(f"Error in evaluation: {e}")
-                continue
-                
-            time.sleep(1)  # Rate limiting
-            
-        except Exception as e:
-            print(f"Error processing question {i+1}: {e}")
-            continue
-    
-    # Calculate averages
-    num_results = len(results)
+    # Calculate averages over the questions that were actually graded
+    graded_scores = scores[scores[:, 0] >= 0]
+    num_results = len(graded_scores)
     if num_results > 0:
-        avg_scores = {
-            'relevancy': total_scores['relevancy'] / num_results,
-            'accuracy': total_scores['accuracy'] / num_results,
-            'completeness': total_scores['completeness'] / num_results
-        }
+        avg_scores = dict(zip(SCORE_METRICS, graded_scores.mean(axis=0).tolist()))
         
-        overall_score = sum(avg_scores.values()) / 3
+        overall_score = float(graded_scores.mean())
         
         print(f"\n{'='*50}")
         print("EVALUATION RESULTS")
@@ -157,7 +118,6 @@ def simple_rag_evaluation():
             print("❌ Poor Performance - Major Issues")
         
         # Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"simple_rag_evaluation_{timestamp}.json"
         
         summary = {
@@ -165,20 +125,19 @@ def simple_rag_evaluation():
             'total_questions': num_results,
             'average_scores': avg_scores,
             'overall_score': overall_score,
-            'detailed_results': results
+            'detailed_results_file': details_filename
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        write_json(filename, summary)
         
         print(f"\n✅ Results saved to {filename}")
+        print(f"✅ Per-question results saved to {details_filename}")
         
         # Show sample result
-        if results:
+        if sample:
             print(f"\n{'='*50}")
             print("SAMPLE RESULT")
             print(f"{'='*50}")
-            sample = results[0]
             print(f"Question: {sample['question']}")
             print(f"Generated: {sample['generated_answer'][:200]}...")
             print(f"Ground Truth: {sample['ground_truth'][:200]}...")
@@ -187,19 +146,136 @@ def simple_rag_evaluation():
     else:
         print("❌ No results to analyze")
 
-def extract_score(text, metric):
-    """Extract score from evaluation text"""
-    try:
-        lines = text.split('\n')
-        for line in lines:
-            if metric.lower() in line.lower() and '/10' in line:
-                # Extract number before /10
-                parts = line.split('/10')[0]
-                score_part = parts.split(':')[-1].strip()
-                return int(score_part)
-        return 5  # Default score if not found
-    except:
-        return 5  # Default score on error
+async def evaluate_questions(retriever, llm, test_data, details_file):
+    """Generate RAG answers concurrently, then grade them all in one batched LLM pass
+    
+    Each graded result is appended to details_file as a JSON line. Returns an int8 matrix with one
+    (relevancy, accuracy, completeness) row per question, -1 where grading failed, and the first
+    result (for display).
+    """
+    semaphore = asyncio.Semaphore(RAG_CONCURRENCY)
+    
+    # Embed every question in one batch; each search then runs on its precomputed vector
+    all_docs = batch_similarity_search(
+        retriever.vectorstore, (item['question'] for item in test_data), k=retriever.search_kwargs["k"]
+    )
+    
+    async def _generate(item, retrieved_docs):
+        if isinstance(retrieved_docs, Exception):
+            # Retrieval failed for this question only; gather records it as this question's error
+            raise retrieved_docs
+        async with semaphore:
+            return await acreate_cached_rag_response(
+                rag_cache,
+                retriever=retriever,
+                question=item['question'],
+                chat_history="",
+                language="English",
+                retrieved_docs=retrieved_docs
+            )
+    
+    # Answers from earlier runs with the same retriever settings are reused from disk
+    with open_disk_cache(RAG_RESPONSE_CACHE_DIR) as rag_cache:
+        rag_responses = await asyncio.gather(
+            *(_generate(item, docs) for item, docs in zip(test_data, all_docs)), return_exceptions=True
+        )
+    
+    generated = []
+    for i, (item, rag_response) in enumerate(zip(test_data, rag_responses)):
+        if isinstance(rag_response, Exception):
+            print(f"Error processing question {i+1}: {rag_response}")
+        else:
+            generated.append((i, item, rag_response))
+    
+    # Near-verbatim answers are scored directly; only the rest go to the grading LLM
+    eval_responses = [None] * len(generated)
+    to_grade = []
+    for j, (_, item, rag_response) in enumerate(generated):
+        if matches_ground_truth(rag_response.answer, item['answer']):
+            eval_responses[j] = Scores(
+                relevancy=10,
+                accuracy=10,
+                completeness=10,
+                explanation="Generated answer matches the ground truth; LLM grading skipped."
+            )
+        else:
+            to_grade.append(j)
+    
+    # Grading requests are dispatched as slots free up instead of one at a time with a sleep between
+    evaluation_prompts = [
+        EVALUATION_PROMPT.format(
+            question=generated[j][1]['question'],
+            ground_truth=generated[j][1]['answer'],
+            generated_answer=generated[j][2].answer
+        )
+        for j in to_grade
+    ]
+    graded = await llm.abatch(
+        evaluation_prompts,
+        config={"max_concurrency": RAG_CONCURRENCY},
+        return_exceptions=True
+    ) if evaluation_prompts else []
+    for j, eval_response in zip(to_grade, graded):
+        eval_responses[j] = eval_response
+    
+    scores = np.full((len(test_data), len(SCORE_METRICS)), -1, dtype=np.int8)
+    sample = None
+    for (i, item, rag_response), eval_response in zip(generated, eval_responses):
+        question = item['question']
+        ground_truth = item['answer']
+        case_name = item.get('case_name', 'Unknown Case')
+        generated_answer = rag_response.answer
+        references = rag_response.references
+        
+        print(f"\n--- Question {i+1}/{len(test_data)} ---")
+        print(f"Case: {case_name}")
+        print(f"Q: {question}")
+        print(f"Generated Answer: {generated_answer[:150]}...")
+        print(f"Ground Truth: {ground_truth[:150]}...")
+        print(f"References Found: {len(references)}")
+        
+        if isinstance(eval_response, Exception):
+            print(f"Error in evaluation: {eval_response}")
+            continue
+        
+        relevancy = eval_response.relevancy
+        accuracy = eval_response.accuracy
+        completeness = eval_response.completeness
+        
+        print(f"Scores - Relevancy: {relevancy}/10, Accuracy: {accuracy}/10, Completeness: {completeness}/10")
+        
+        result = {
+            'question': question,
+            'ground_truth': ground_truth,
+            'generated_answer': generated_answer,
+            'case_name': case_name,
+            'scores': {
+                'relevancy': relevancy,
+                'accuracy': accuracy,
+                'completeness': completeness
+            },
+            'references_count': len(references),
+            'evaluation': eval_response.explanation
+        }
+        details_file.write(to_json_line(result))
+        
+        scores[i] = (relevancy, accuracy, completeness)
+        if sample is None:
+            sample = result
+    
+    return scores, sample
+
+def matches_ground_truth(generated_answer, ground_truth, threshold=MATCH_THRESHOLD):
+    """True when the generated answer is (near-)identical to the ground truth, ignoring case"""
+    a = generated_answer.strip().casefold()
+    b = ground_truth.strip().casefold()
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    # The quick ratios are cheap upper bounds, so most mismatches never reach the full ratio()
+    return (matcher.real_quick_ratio() > threshold
+            and matcher.quick_ratio() > threshold
+            and matcher.ratio() > threshold)
 
 if __name__ == "__main__":
     simple_rag_evaluation()
\ No newline at end of file
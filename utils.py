@@ -1,13 +1,43 @@
 import os
+import json
+import hashlib
+import shelve
+import random
+import asyncio
+import itertools
+import operator
+import contextlib
+import importlib.util
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.chains import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.prompts import ChatPromptTemplate
 from langchain.memory import ConversationBufferMemory
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
 # Language configurations
 LANGUAGES = {
     "English": "🇬🇧",
@@ -29,6 +59,16 @@ load_dotenv()
 
 # Constants
 CHROMA_DIR = "chroma_db"
+# Max in-flight RAG calls when generating responses for evaluation runs
+RAG_CONCURRENCY = int(os.getenv("RAG_CONCURRENCY", "16"))
+# OpenAI requests per minute allowed across those concurrent calls
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+# Local caches for evaluation runs (embeddings and LLM judge prompts)
+EMBEDDING_CACHE_DIR = ".emb_cache"
+LLM_CACHE_PATH = ".llm_cache.db"
+# Generated RAG answers, keyed by question + retriever settings; bump the version to invalidate
+RAG_RESPONSE_CACHE_DIR = ".rag_cache"
+RAG_RESPONSE_CACHE_VERSION = 2
 
 def get_embeddings_model():
     """Initialize and return the HuggingFace embeddings model"""
@@ -43,6 +83,54 @@ def get_embeddings_model():
     
     return embeddings
 
+def get_rate_limiter():
+    """Token bucket capped at OPENAI_RPM; a no-op context when aiolimiter is not installed"""
+    if AsyncLimiter is None:
+        return contextlib.nullcontext()
+    return AsyncLimiter(OPENAI_RPM, 60)
+
+_openai_async_http_client = None
+
+def get_openai_async_http_client():
+    """Process-wide keep-alive httpx client for async OpenAI calls, created on first use (HTTP/2 when h2 is installed)"""
+    global _openai_async_http_client
+    if _openai_async_http_client is None:
+        import httpx
+        
+        _openai_async_http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+            timeout=60
+        )
+    return _openai_async_http_client
+
+def get_cached_openai_embeddings():
+    """Return OpenAI embeddings backed by a local file store, so repeated texts are embedded only once"""
+    # Evaluation-only; imported here so the app does not load the caching machinery
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
+    
+    underlying = OpenAIEmbeddings()
+    return CacheBackedEmbeddings.from_bytes_store(
+        underlying,
+        LocalFileStore(EMBEDDING_CACHE_DIR),
+        namespace=underlying.model
+    )
+
+def open_disk_cache(cache_dir):
+    """Open a persistent key/value cache, preferring diskcache and falling back to shelve"""
+    if diskcache is not None:
+        return diskcache.Cache(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    return shelve.open(os.path.join(cache_dir, "entries"))
+
+def enable_llm_cache():
+    """Memoize identical LLM prompts (e.g. RAGAS judge calls) in a local SQLite database"""
+    from langchain.globals import set_llm_cache
+    from langchain_community.cache import SQLiteCache
+    
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 def load_vector_store():
     """Load the existing vector store"""
     embeddings = get_embeddings_model()
@@ -57,6 +145,71 @@ def load_vector_store():
     
     return vector_store
 
+_page_content = operator.attrgetter("page_content")
+
+def docs_to_contexts(docs):
+    """Return the page_content of each retrieved document"""
+    return list(map(_page_content, docs))
+
+def load_json_sample(file_path, sample_size, seed=None):
+    """Load up to sample_size records from a JSON array file
+    
+    Records are streamed with ijson when it is installed, so memory stays bounded by sample_size
+    instead of the whole dataset. Without a seed the first sample_size records are returned;
+    with a seed a reproducible reservoir sample is drawn over the full file.
+    """
+    with open(file_path, 'rb') as f:
+        if ijson is not None:
+            records = ijson.items(f, 'item', use_float=True)
+        else:
+            data = orjson.loads(f.read()) if orjson is not None else json.load(f)
+            # Full-dataset run: hand back the parsed list as is, no copy or sampling
+            if len(data) <= sample_size:
+                return data
+            records = iter(data)
+        
+        reservoir = list(itertools.islice(records, sample_size))
+        if seed is None or len(reservoir) < sample_size:
+            # Either no sampling was asked for, or the file ran out before sample_size
+            return reservoir
+        
+        rng = random.Random(seed)
+        for i, record in enumerate(records, start=sample_size):
+            j = rng.randint(0, i)
+            if j < sample_size:
+                reservoir[j] = record
+        return reservoir
+
+def read_json(file_path):
+    """Parse a whole JSON file, using orjson when it is installed"""
+    with open(file_path, 'rb') as f:
+        if orjson is not None:
+            return orjson.loads(f.read())
+        return json.load(f)
+
+def write_json(file_path, data):
+    """Write data as indented UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def to_json_line(record):
+    """Serialize one record as a UTF-8 JSON Lines entry"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+def read_jsonl(file_path):
+    """Yield records from a JSON Lines file"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
 def extract_document_name(source_path):
     """Extract document name from file path"""
     if not source_path:
@@ -112,8 +265,41 @@ Respond in {language}."""
     except:
         return "Reference: Based on general knowledge of Indian law"
 
-def create_enhanced_rag_response(retriever, question, chat_history="", language="English"):
-    """Create enhanced RAG response with references"""
+@dataclass(slots=True)
+class RagResponse:
+    """Answer returned by create_enhanced_rag_response, with the material it was built from"""
+    answer: str
+    references: list = field(default_factory=list)
+    contexts: list = field(default_factory=list)
+    retrieved_docs: list = field(default_factory=list)
+
+def batch_similarity_search(vector_store, questions, k):
+    """Embed all questions in one batched call, then run a vector search per precomputed embedding
+    
+    If the batched path fails, each question is retrieved on its own instead; a question whose
+    retrieval still fails gets the exception in its slot (like abatch with return_exceptions=True).
+    """
+    questions = list(questions)
+    try:
+        vectors = vector_store.embeddings.embed_documents(questions)
+        return [vector_store.similarity_search_by_vector(vector, k=k) for vector in vectors]
+    except Exception:
+        pass
+    
+    results = []
+    for question in questions:
+        try:
+            results.append(vector_store.similarity_search(question, k=k))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def create_enhanced_rag_response(retriever, question, chat_history="", language="English", retrieved_docs=None):
+    """Create enhanced RAG response with references
+    
+    If retrieved_docs is given (e.g. from a batched retriever call), the retriever is not queried again.
+    The documents used are returned as RagResponse.retrieved_docs so callers don't need to re-retrieve.
+    """
     llm = ChatOpenAI(model="gpt-4o-mini")
     
     # Language-specific instructions
@@ -124,10 +310,12 @@ def create_enhanced_rag_response(retriever, question, chat_history="", language=
     }
     
     # Retrieve relevant documents
-    retrieved_docs = retriever.invoke(question)
+    if retrieved_docs is None:
+        retrieved_docs = retriever.invoke(question)
     
     # Create context from retrieved documents
-    context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+    contexts = docs_to_contexts(retrieved_docs)
+    context = "\n\n".join(contexts)
     
     # Create the main response prompt
     system_template = f"""You are an expert legal assistant specializing in Indian law. 
@@ -215,10 +403,44 @@ Question: {question}"""
                 "type": "synthetic"
             })
     
-    return {
-        "answer": answer,
-        "references": references
-    }
+    return RagResponse(
+        answer=answer,
+        references=references,
+        contexts=contexts,
+        retrieved_docs=retrieved_docs
+    )
+
+async def acreate_enhanced_rag_response(retriever, question, chat_history="", language="English", retrieved_docs=None):
+    """Async variant of create_enhanced_rag_response; runs the blocking LLM call in a worker thread"""
+    return await asyncio.to_thread(
+        create_enhanced_rag_response, retriever, question, chat_history, language, retrieved_docs
+    )
+
+def rag_response_cache_key(retriever, question, chat_history="", language="English"):
+    """Stable hash of a question together with the retriever settings that shape its answer"""
+    payload = json.dumps(
+        [
+            question,
+            chat_history,
+            language,
+            getattr(retriever, "search_type", None),
+            getattr(retriever, "search_kwargs", None),
+            RAG_RESPONSE_CACHE_VERSION
+        ],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def acreate_cached_rag_response(cache, retriever, question, chat_history="", language="English", retrieved_docs=None):
+    """acreate_enhanced_rag_response that reuses answers stored in cache (see open_disk_cache) across runs"""
+    key = rag_response_cache_key(retriever, question, chat_history, language)
+    response = cache.get(key)
+    if response is None:
+        response = await acreate_enhanced_rag_response(retriever, question, chat_history, language, retrieved_docs)
+        cache[key] = response
+    return response
 
 def create_rag_chain(retriever, language="English"):
     """Create a RAG chain with the retriever and LLM (legacy function for compatibility)"""
@@ -1,28 +1,50 @@
 import json
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def load_results(file_path="ragas_evaluation_results.json"):
-    """Load evaluation results from JSON"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load evaluation results from JSON, or from JSON Lines (header line, then one result per line)"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(file_path, 'rb') as f:
+        if file_path.endswith('.jsonl'):
+            data = loads(f.readline())
+            data['results'] = [loads(line) for line in f if line.strip()]
+            return data
+        return loads(f.read())
 
-def create_visualizations(data):
-    """Create visualization charts for RAGAS metrics"""
+def create_visualizations(data, dpi=120):
+    """Create visualization charts for RAGAS metrics
+    
+    dpi defaults to screen resolution; pass 300 for publication-quality output.
+    """
     metrics = data['metrics']
     
     # Set style
-    sns.set_style("whitegrid")
+    # Equivalent of seaborn's "whitegrid" style without importing seaborn
+    plt.rcParams.update({
+        'axes.facecolor': 'white',
+        'axes.edgecolor': '.8',
+        'axes.grid': True,
+        'axes.axisbelow': True,
+        'grid.color': '.8',
+    })
     plt.rcParams['figure.figsize'] = (14, 10)
     
-    # Create subplots
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    # Create subplots; the radar panel is polar from the start rather than replacing a cartesian axis
+    fig = plt.figure(figsize=(14, 10))
+    ax1 = fig.add_subplot(2, 2, 1)
+    ax_radar = fig.add_subplot(2, 2, 2, projection='polar')
+    ax3 = fig.add_subplot(2, 2, 3)
+    ax4 = fig.add_subplot(2, 2, 4)
     fig.suptitle('RAGAS Evaluation Results - Indian Legal Assistant', fontsize=16, fontweight='bold')
     
     # 1. Overall Metrics Bar Chart
-    ax1 = axes[0, 0]
     metric_names = list(metrics.keys())
     metric_values = list(metrics.values())
     colors = ['#2ecc71', '#3498db', '#e74c3c', '#f39c12']
@@ -44,18 +66,15 @@ def create_visualizations(data):
     plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
     
     # 2. Metric Comparison Radar Chart
-    ax2 = axes[0, 1]
-    ax2.axis('off')
-    
     # Create radar chart
     categories = list(metrics.keys())
     values = list(metrics.values())
     
-    angles = [n / len(categories) * 2 * 3.14159 for n in range(len(categories))]
-    values += values[:1]
-    angles += angles[:1]
+    angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False)
+    # Close the polygon by repeating the first point
+    values = np.append(values, values[0])
+    angles = np.append(angles, angles[0])
     
-    ax_radar = plt.subplot(2, 2, 2, projection='polar')
     ax_radar.plot(angles, values, 'o-', linewidth=2, color='#3498db')
     ax_radar.fill(angles, values, alpha=0.25, color='#3498db')
     ax_radar.set_xticks(angles[:-1])
@@ -65,12 +84,12 @@ def create_visualizations(data):
     ax_radar.grid(True)
     
     # 3. Performance Summary Table
-    ax3 = axes[1, 0]
     ax3.axis('tight')
     ax3.axis('off')
     
     # Create performance interpretation
     performance_data = []
+    status_colors = []
     for metric, value in metrics.items():
         if value >= 0.7:
             status = '✓ Good'
@@ -83,6 +102,7 @@ def create_visualizations(data):
             color = '#f8d7da'
         
         performance_data.append([metric.replace('_', ' ').title(), f'{value:.4f}', status])
+        status_colors.append(color)
     
     table = ax3.table(cellText=performance_data,
                      colLabels=['Metric', 'Score', 'Status'],
@@ -94,15 +114,8 @@ def create_visualizations(data):
     table.set_fontsize(10)
     table.scale(1, 2)
     
-    # Color code the status column
-    for i in range(1, len(performance_data) + 1):
-        value = float(performance_data[i-1][1])
-        if value >= 0.7:
-            color = '#d4edda'
-        elif value >= 0.5:
-            color = '#fff3cd'
-        else:
-            color = '#f8d7da'
+    # Color code the status column with the colors picked above
+    for i, color in enumerate(status_colors, 1):
         table[(i, 2)].set_facecolor(color)
     
     # Header styling
@@ -113,20 +126,21 @@ def create_visualizations(data):
     ax3.set_title('Performance Summary', fontsize=14, fontweight='bold')
     
     # 4. Metric Insights
-    ax4 = axes[1, 1]
     ax4.axis('off')
     
     insights_text = "Key Insights:\n\n"
     
-    # Generate insights
-    avg_score = sum(metrics.values()) / len(metrics)
+    # Generate insights from one array of scores
+    names = list(metrics.keys())
+    scores = np.fromiter(metrics.values(), dtype=float, count=len(metrics))
+    avg_score = scores.mean()
     insights_text += f"• Average Score: {avg_score:.3f}\n\n"
     
-    best_metric = max(metrics.items(), key=lambda x: x[1])
-    insights_text += f"• Best Metric: {best_metric[0].replace('_', ' ').title()}\n  ({best_metric[1]:.3f})\n\n"
+    best = scores.argmax()
+    insights_text += f"• Best Metric: {names[best].replace('_', ' ').title()}\n  ({scores[best]:.3f})\n\n"
     
-    worst_metric = min(metrics.items(), key=lambda x: x[1])
-    insights_text += f"• Needs Focus: {worst_metric[0].replace('_', ' ').title()}\n  ({worst_metric[1]:.3f})\n\n"
+    worst = scores.argmin()
+    insights_text += f"• Needs Focus: {names[worst].replace('_', ' ').title()}\n  ({scores[worst]:.3f})\n\n"
     
     # Recommendations
     insights_text += "Recommendations:\n"
@@ -151,10 +165,11 @@ def create_visualizations(data):
     # Save figure
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"ragas_visualization_{timestamp}.png"
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
     print(f"✓ Visualization saved: {filename}")
     
     plt.show()
+    plt.close(fig)
 
 def generate_report(data):
     """Generate detailed text report"""
@@ -176,7 +191,7 @@ def generate_report(data):
         status = "✓" if value >= 0.7 else "⚠" if value >= 0.5 else "✗"
         print(f"{status} {metric.replace('_', ' ').title():.<50} {value:.4f}")
     
-    avg_score = sum(metrics.values()) / len(metrics)
+    avg_score = np.fromiter(metrics.values(), dtype=float, count=len(metrics)).mean()
     print(f"\n{'Average Score':.<50} {avg_score:.4f}")
     
     print("\n" + "-" * 70)
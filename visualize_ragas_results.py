@@ -4,18 +4,86 @@ Generates comprehensive graphs and charts from RAGAS evaluation results
 """
 
 import json
+import multiprocessing
 import os
-import glob
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-import numpy as np
+from functools import lru_cache
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# matplotlib, seaborn, pandas and numpy are imported where they are used, so --help and a
+# missing results file do not pay for loading them
+
+_mpl_configured = False
+
+
+def _configure_mpl():
+    """Apply the plot style once per process"""
+    global _mpl_configured
+    if _mpl_configured:
+        return
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 8)
+    plt.rcParams['font.size'] = 10
+    _mpl_configured = True
+
+
+@lru_cache(maxsize=None)
+def _palette(n: int):
+    """Return n viridis bar/box colors, computed once per metric count"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    
+    return plt.cm.viridis(np.linspace(0.3, 0.9, n))
+
+# Per-question metrics written by ragas_evaluation_comprehensive.py
+METRIC_NAMES = (
+    'faithfulness',
+    'answer_relevancy',
+    'context_precision',
+    'context_recall',
+    'answer_correctness'
+)
+
+# Plot routines (and the file name each one writes) are independent once the results are
+# loaded, so they can run in separate processes
+PLOT_METHODS = {
+    "create_overall_metrics_chart": "overall_metrics",
+    "create_distribution_histograms": "metrics_distribution",
+    "create_correlation_heatmap": "correlation_heatmap",
+    "create_box_plots": "metrics_boxplot",
+    "create_detailed_table": "statistics_table",
+    "create_performance_radar": "performance_radar",
+}
+
+# Plots are vector by default (no PNG encode); the dense annotated heatmap stays raster
+RASTER_PLOTS = {"correlation_heatmap"}
+
+_worker_visualizer = None
+
+
+def _init_plot_worker(visualizer):
+    """Receive the loaded visualizer once per worker process"""
+    global _worker_visualizer
+    import matplotlib.pyplot as plt
+    
+    plt.switch_backend("Agg")  # Workers only write files
+    _configure_mpl()
+    _worker_visualizer = visualizer
+
+
+def _run_plot(method_name: str) -> str:
+    return getattr(_worker_visualizer, method_name)()
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 10
 
 class RAGASVisualizer:
     """Generate visualizations from RAGAS evaluation results"""
@@ -28,38 +96,118 @@ class RAGASVisualizer:
             results_file: Path to RAGAS results JSON. If None, uses latest.
         """
         if results_file is None:
-            # Find latest results file
-            results_files = glob.glob("evaluation_results/ragas_evaluation_*.json")
-            if not results_files:
+            # Find latest results file in one directory pass (DirEntry caches its stat)
+            latest = None
+            if os.path.isdir("evaluation_results"):
+                with os.scandir("evaluation_results") as it:
+                    latest = max(
+                        (e for e in it if e.name.startswith("ragas_evaluation_") and e.name.endswith(".json")),
+                        key=lambda e: e.stat().st_ctime,
+                        default=None
+                    )
+            if latest is None:
                 raise FileNotFoundError("No RAGAS evaluation results found!")
-            results_file = max(results_files, key=os.path.getctime)
+            results_file = latest.path
             print(f"📂 Using latest results: {results_file}")
         
         self.results_file = results_file
         self.viz_dir = "evaluation_results/visualizations"
         os.makedirs(self.viz_dir, exist_ok=True)
         
-        # Load results
-        with open(results_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        # Load results (orjson when installed; results files are float-heavy)
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(results_file, 'rb') as f:
+            self.data = loads(f.read())
+        
+        # Newer runs stream per-question results to a JSON Lines file next to the summary
+        if 'detailed_results' not in self.data and 'detailed_results_file' in self.data:
+            detailed_path = os.path.join(os.path.dirname(results_file), self.data['detailed_results_file'])
+            with open(detailed_path, 'rb') as f:
+                self.data['detailed_results'] = [loads(line) for line in f if line.strip()]
+        
+        import numpy as np
+        import pandas as pd
+        
+        # Per-question metric scores, built once and shared by every plot that needs them.
+        # Scores live in [0, 1] and are reported to 4 decimals, so float32 is plenty;
+        # fromiter streams them into one preallocated record array (None -> NaN).
+        detailed_results = self.data['detailed_results']
+        scores = np.fromiter(
+            (
+                tuple(np.nan if metrics.get(name) is None else metrics[name] for name in METRIC_NAMES)
+                for metrics in map(itemgetter('metrics'), detailed_results)
+            ),
+            dtype=np.dtype([(name, np.float32) for name in METRIC_NAMES]),
+            count=len(detailed_results)
+        )
+        self._metrics_df = pd.DataFrame(scores)
+        
+        # 150 DPI is plenty for the HTML report; set RAGAS_VIZ_DPI=300 for print-quality images
+        self._dpi = int(os.environ.get("RAGAS_VIZ_DPI", 150))
+        
+        # Paths written by _save_figure (or returned by the plot workers), used by the HTML report
+        self._produced_viz = []
+        
+        # Display names for every metric, shared by the plots and the HTML report
+        metric_keys = dict.fromkeys((*METRIC_NAMES, *self.data['overall_metrics']))
+        self._pretty = {metric: metric.replace('_', ' ').title() for metric in metric_keys}
+        self._pretty_radar = {metric: metric.replace('_', '\n').title() for metric in metric_keys}
         
         self.timestamp = self.data['timestamp']
         print(f"✅ Loaded results from {self.timestamp}")
         print(f"📊 Sample size: {self.data['sample_size']}")
     
+    def __getstate__(self):
+        """Pickled copies (plot workers) carry _metrics_df, not the per-question answers and contexts"""
+        state = self.__dict__.copy()
+        state['data'] = {key: value for key, value in self.data.items() if key != 'detailed_results'}
+        return state
+    
+    def _output_path(self, name: str, ext: str = None) -> str:
+        if ext is None:
+            ext = "png" if name in RASTER_PLOTS else "svg"
+        return os.path.join(self.viz_dir, f"{name}_{self.timestamp}.{ext}")
+    
+    def _outputs_up_to_date(self) -> bool:
+        """True if every plot and the HTML report are newer than the results file"""
+        expected = [self._output_path(name) for name in PLOT_METHODS.values()]
+        expected.append(self._output_path("evaluation_report", "html"))
+        try:
+            src_mtime = os.path.getmtime(self.results_file)
+            return all(os.path.getmtime(path) > src_mtime for path in expected)
+        except OSError:
+            return False
+    
+    def _save_figure(self, fig, name: str) -> str:
+        """Save a figure as <name>_<timestamp>.svg (or .png for RASTER_PLOTS) in viz_dir and release it"""
+        import matplotlib.pyplot as plt
+        
+        output_path = self._output_path(name)
+        if output_path.endswith(".png"):
+            # Fast zlib level: these PNGs are only read by the local HTML report
+            fig.savefig(output_path, dpi=self._dpi, bbox_inches='tight', pil_kwargs={'compress_level': 1})
+        else:
+            fig.savefig(output_path, bbox_inches='tight')
+        print(f"✅ Saved: {output_path}")
+        plt.close(fig)
+        self._produced_viz.append(output_path)
+        return output_path
+    
     def create_overall_metrics_chart(self):
         """Create bar chart of overall metrics"""
+        import matplotlib.pyplot as plt
+        
         print("\n📊 Creating overall metrics chart...")
         
         metrics = self.data['overall_metrics']
         
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
         
         metric_names = list(metrics.keys())
         scores = list(metrics.values())
         
         # Create color map
-        colors = plt.cm.viridis(np.linspace(0.3, 0.9, len(metric_names)))
+        colors = _palette(len(metric_names))
         
         bars = ax.bar(metric_names, scores, color=colors, edgecolor='black', linewidth=1.5)
         
@@ -79,47 +227,40 @@ class RAGASVisualizer:
         # Rotate x labels
         plt.xticks(rotation=45, ha='right')
         
-        plt.tight_layout()
-        
-        output_path = os.path.join(self.viz_dir, f"overall_metrics_{self.timestamp}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_path}")
-        plt.close()
+        return self._save_figure(fig, "overall_metrics")
     
     def create_distribution_histograms(self):
         """Create distribution histograms for each metric"""
+        import matplotlib.pyplot as plt
+        import numpy as np
+        
         print("\n📊 Creating metric distribution histograms...")
         
-        # Extract individual scores
-        detailed_results = self.data['detailed_results']
+        # Extract individual scores column-wise, dropping missing ones
+        df = self._metrics_df
         
         metrics_data = {
-            'faithfulness': [],
-            'answer_relevancy': [],
-            'context_precision': [],
-            'context_recall': [],
-            'answer_correctness': []
+            metric_name: df[metric_name].dropna().to_numpy()
+            for metric_name in METRIC_NAMES
         }
         
-        for result in detailed_results:
-            for metric_name in metrics_data.keys():
-                score = result['metrics'].get(metric_name)
-                if score is not None:
-                    metrics_data[metric_name].append(score)
-        
         # Create subplots
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+        fig, axes = plt.subplots(2, 3, figsize=(15, 10), layout='constrained')
         axes = axes.flatten()
         
+        # One colormap call for all panels
+        colors = plt.cm.viridis(np.linspace(0, 1, len(metrics_data), endpoint=False))
+        
         for idx, (metric_name, scores) in enumerate(metrics_data.items()):
             if len(scores) == 0:
                 continue
             
             ax = axes[idx]
             
-            # Create histogram
-            ax.hist(scores, bins=20, color=plt.cm.viridis(idx/len(metrics_data)), 
-                   edgecolor='black', alpha=0.7)
+            # Create histogram: fixed range keeps numpy on its equal-width binning path
+            counts, edges = np.histogram(scores, bins=20, range=(0.0, 1.0))
+            ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                   color=colors[idx], edgecolor='black', alpha=0.7)
             
             # Add mean line
             mean_score = np.mean(scores)
@@ -128,7 +269,7 @@ class RAGASVisualizer:
             
             ax.set_xlabel('Score', fontweight='bold')
             ax.set_ylabel('Frequency', fontweight='bold')
-            ax.set_title(f'{metric_name.replace("_", " ").title()}', 
+            ax.set_title(self._pretty[metric_name], 
                         fontweight='bold', fontsize=11)
             ax.legend()
             ax.grid(alpha=0.3)
@@ -136,33 +277,39 @@ class RAGASVisualizer:
         # Remove extra subplot
         fig.delaxes(axes[-1])
         
-        plt.suptitle('Distribution of RAGAS Metrics Across Samples', 
-                    fontsize=14, fontweight='bold', y=1.00)
-        plt.tight_layout()
+        # Constrained layout reserves room for the suptitle as long as y is left automatic
+        fig.suptitle('Distribution of RAGAS Metrics Across Samples', 
+                    fontsize=14, fontweight='bold')
         
-        output_path = os.path.join(self.viz_dir, f"metrics_distribution_{self.timestamp}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_path}")
-        plt.close()
+        return self._save_figure(fig, "metrics_distribution")
     
     def create_correlation_heatmap(self):
         """Create correlation heatmap between metrics"""
-        print("\n📊 Creating correlation heatmap...")
-        
-        # Extract metrics into DataFrame
-        detailed_results = self.data['detailed_results']
-        
-        metrics_list = []
-        for result in detailed_results:
-            metrics_list.append(result['metrics'])
+        import matplotlib.pyplot as plt
+        import numpy as np
+        import pandas as pd
+        import seaborn as sns
         
-        df = pd.DataFrame(metrics_list)
+        print("\n📊 Creating correlation heatmap...")
         
-        # Calculate correlation
-        correlation = df.corr()
+        # Metrics that were never scored are dropped; scattered NaNs from failed judgments stay
+        df = self._metrics_df.dropna(axis=1, how='all')
+        
+        # Calculate correlation on one contiguous float32 array. With missing scores, each pair
+        # uses the rows where both metrics are present (pairwise-complete, like df.corr())
+        arr = df.to_numpy(dtype=np.float32)
+        if not np.isnan(arr).any():
+            corr = np.corrcoef(arr, rowvar=False)
+        else:
+            corr = df.corr().to_numpy()
+        correlation = pd.DataFrame(
+            np.atleast_2d(corr),
+            index=df.columns,
+            columns=df.columns
+        )
         
         # Create heatmap
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig, ax = plt.subplots(figsize=(10, 8), layout='constrained')
         
         sns.heatmap(correlation, annot=True, fmt='.3f', cmap='coolwarm', 
                    center=0, square=True, linewidths=1, cbar_kws={"shrink": 0.8},
@@ -171,34 +318,24 @@ class RAGASVisualizer:
         ax.set_title('Correlation Between RAGAS Metrics', 
                     fontsize=14, fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        
-        output_path = os.path.join(self.viz_dir, f"correlation_heatmap_{self.timestamp}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_path}")
-        plt.close()
+        return self._save_figure(fig, "correlation_heatmap")
     
     def create_box_plots(self):
         """Create box plots for metric comparison"""
-        print("\n📊 Creating box plots...")
-        
-        # Extract metrics into DataFrame
-        detailed_results = self.data['detailed_results']
+        import matplotlib.pyplot as plt
         
-        metrics_list = []
-        for result in detailed_results:
-            metrics_list.append(result['metrics'])
+        print("\n📊 Creating box plots...")
         
-        df = pd.DataFrame(metrics_list)
+        df = self._metrics_df
         
         # Create box plot
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig, ax = plt.subplots(figsize=(12, 6), layout='constrained')
         
-        df.boxplot(ax=ax, patch_artist=True)
+        bp = df.boxplot(ax=ax, patch_artist=True, return_type='dict')
         
-        # Color the boxes
-        colors = plt.cm.viridis(np.linspace(0.3, 0.9, len(df.columns)))
-        for patch, color in zip(ax.artists, colors):
+        # Color the boxes (ax.artists no longer holds the box patches in recent matplotlib)
+        colors = _palette(len(df.columns))
+        for patch, color in zip(bp['boxes'], colors):
             patch.set_facecolor(color)
             patch.set_alpha(0.7)
         
@@ -209,41 +346,42 @@ class RAGASVisualizer:
         ax.grid(axis='y', alpha=0.3)
         
         plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
         
-        output_path = os.path.join(self.viz_dir, f"metrics_boxplot_{self.timestamp}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_path}")
-        plt.close()
+        return self._save_figure(fig, "metrics_boxplot")
     
     def create_detailed_table(self):
         """Create detailed statistics table"""
-        print("\n📊 Creating detailed statistics table...")
-        
-        # Extract metrics into DataFrame
-        detailed_results = self.data['detailed_results']
-        
-        metrics_list = []
-        for result in detailed_results:
-            metrics_list.append(result['metrics'])
+        import matplotlib.pyplot as plt
+        import numpy as np
         
-        df = pd.DataFrame(metrics_list)
+        print("\n📊 Creating detailed statistics table...")
         
-        # Calculate statistics
-        stats = df.describe().T
-        stats['median'] = df.median()
-        stats = stats[['mean', 'median', 'std', 'min', 'max']]
+        df = self._metrics_df
+        
+        # Calculate statistics straight on the float32 array, skipping missing scores.
+        # ddof=1 matches the sample std pandas' describe() reported; metrics that were
+        # never scored stay NaN, as before, without the empty-slice warnings.
+        arr = df.to_numpy()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            stats = np.stack([
+                np.nanmean(arr, axis=0),
+                np.nanmedian(arr, axis=0),
+                np.nanstd(arr, axis=0, ddof=1),
+                np.nanmin(arr, axis=0),
+                np.nanmax(arr, axis=0)
+            ], axis=1)
         
         # Create table visualization
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
         ax.axis('tight')
         ax.axis('off')
         
         # Format the data
         table_data = []
-        for metric in stats.index:
-            row = [metric.replace('_', ' ').title()]
-            row.extend([f"{val:.4f}" for val in stats.loc[metric]])
+        for metric, metric_stats in zip(df.columns, stats):
+            row = [self._pretty[metric]]
+            row.extend([f"{val:.4f}" for val in metric_stats])
             table_data.append(row)
         
         table = ax.table(cellText=table_data,
@@ -270,31 +408,29 @@ class RAGASVisualizer:
         plt.title('RAGAS Metrics - Detailed Statistics', 
                  fontweight='bold', fontsize=14, pad=20)
         
-        output_path = os.path.join(self.viz_dir, f"statistics_table_{self.timestamp}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_path}")
-        plt.close()
+        return self._save_figure(fig, "statistics_table")
     
     def create_performance_radar(self):
         """Create radar chart for overall performance"""
+        import matplotlib.pyplot as plt
+        import numpy as np
+        
         print("\n📊 Creating performance radar chart...")
         
         metrics = self.data['overall_metrics']
         
         # Prepare data
         categories = list(metrics.keys())
-        values = list(metrics.values())
-        
-        # Number of variables
-        N = len(categories)
+        values = np.asarray(list(metrics.values()), dtype=np.float32)
         
         # Compute angle for each axis
-        angles = [n / float(N) * 2 * np.pi for n in range(N)]
-        values += values[:1]  # Complete the circle
-        angles += angles[:1]
+        angles = np.linspace(0, 2 * np.pi, values.size, endpoint=False)
+        values = np.r_[values, values[:1]]  # Complete the circle
+        angles = np.r_[angles, angles[:1]]
         
         # Create plot
-        fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'))
+        fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'),
+                               layout='constrained')
         
         # Draw the plot
         ax.plot(angles, values, 'o-', linewidth=2, color='#2E86AB', label='Scores')
@@ -302,7 +438,7 @@ class RAGASVisualizer:
         
         # Fix axis to go in the right order
         ax.set_xticks(angles[:-1])
-        ax.set_xticklabels([cat.replace('_', '\n').title() for cat in categories], 
+        ax.set_xticklabels([self._pretty_radar[cat] for cat in categories], 
                           fontsize=10, fontweight='bold')
         
         # Set y-axis limits
@@ -316,19 +452,21 @@ class RAGASVisualizer:
         plt.title('RAGAS Metrics - Performance Radar', 
                  fontweight='bold', fontsize=14, pad=30)
         
-        output_path = os.path.join(self.viz_dir, f"performance_radar_{self.timestamp}.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_path}")
-        plt.close()
+        return self._save_figure(fig, "performance_radar")
     
     def generate_html_report(self):
         """Generate HTML report with all visualizations"""
         print("\n📄 Generating HTML report...")
         
-        # Get all visualization files
-        viz_files = glob.glob(os.path.join(self.viz_dir, f"*_{self.timestamp}.png"))
+        # Visualizations produced by this run, in plot order; when called on its own,
+        # fall back to whichever expected outputs already exist
+        viz_files = self._produced_viz or [
+            path for path in (self._output_path(name) for name in PLOT_METHODS.values())
+            if os.path.exists(path)
+        ]
         
-        html_content = f"""
+        # Fragments are collected in a list and joined once at the end
+        parts = [f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -403,64 +541,88 @@ class RAGASVisualizer:
                 <p><strong>Evaluation Date:</strong> {self.timestamp}</p>
                 <p><strong>Sample Size:</strong> {self.data['sample_size']} questions</p>
                 <hr>
-        """
+        """]
         
         # Add metrics
-        for metric, score in self.data['overall_metrics'].items():
-            html_content += f"""
+        parts.extend(f"""
                 <div class="metric-item">
-                    <span class="metric-name">{metric.replace('_', ' ').title()}</span>
+                    <span class="metric-name">{self._pretty[metric]}</span>
                     <span class="metric-value">{score:.4f}</span>
                 </div>
-            """
+            """ for metric, score in self.data['overall_metrics'].items())
         
-        html_content += """
+        parts.append("""
             </div>
             
             <h2>📈 Visualizations</h2>
-        """
+        """)
         
-        # Add visualizations
-        for viz_file in sorted(viz_files):
-            viz_name = os.path.basename(viz_file).replace(f"_{self.timestamp}.png", "").replace("_", " ").title()
-            rel_path = os.path.relpath(viz_file, self.viz_dir)
+        # Add visualizations (all files live directly in viz_dir, so the basename is the relative path)
+        suffix = f"_{self.timestamp}"
+        for viz_file in viz_files:
+            file_name = os.path.basename(viz_file)
+            viz_name = os.path.splitext(file_name)[0].replace(suffix, "").replace("_", " ").title()
             
-            html_content += f"""
+            parts.append(f"""
             <div class="visualization">
                 <h3>{viz_name}</h3>
-                <img src="{rel_path}" alt="{viz_name}">
+                <img src="{file_name}" alt="{viz_name}">
             </div>
-            """
+            """)
         
-        html_content += f"""
+        parts.append(f"""
             <div class="footer">
                 <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
                 <p>Legal Advisor Chatbot - RAGAS Evaluation System</p>
             </div>
         </body>
         </html>
-        """
+        """)
+        html_content = "".join(parts)
         
         # Save HTML
-        html_path = os.path.join(self.viz_dir, f"evaluation_report_{self.timestamp}.html")
+        html_path = self._output_path("evaluation_report", "html")
         with open(html_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
         
         print(f"✅ HTML report saved: {html_path}")
         return html_path
     
-    def generate_all_visualizations(self):
-        """Generate all visualizations"""
+    def generate_all_visualizations(self, serial: bool = False, force: bool = False):
+        """
+        Generate all visualizations
+        
+        Args:
+            serial: Render the plots one after another in this process (easier to debug)
+            force: Regenerate even if the outputs are newer than the results file
+        """
         print("\n" + "="*60)
         print("🎨 GENERATING RAGAS VISUALIZATIONS")
         print("="*60)
         
-        self.create_overall_metrics_chart()
-        self.create_distribution_histograms()
-        self.create_correlation_heatmap()
-        self.create_box_plots()
-        self.create_detailed_table()
-        self.create_performance_radar()
+        # Checked before any plotting library is loaded, so an up-to-date run stays cheap
+        if not force and self._outputs_up_to_date():
+            html_path = self._output_path("evaluation_report", "html")
+            print("\n⏭️  Visualizations are newer than the results file, skipping (use --force to rebuild)")
+            print(f"📄 Open HTML report: {html_path}")
+            return html_path
+        
+        _configure_mpl()
+        
+        self._produced_viz = []
+        if serial:
+            for method_name in PLOT_METHODS:
+                getattr(self, method_name)()
+        else:
+            max_workers = min(len(PLOT_METHODS), os.cpu_count() or 1)
+            # spawn, not fork: callers such as run_ragas_evaluation.py reach here with torch,
+            # Chroma and httpx threads already running, which fork does not survive safely
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_plot_worker, initargs=(self,)) as executor:
+                # Workers record into their own copy of the visualizer, so collect the returned paths
+                self._produced_viz.extend(executor.map(_run_plot, PLOT_METHODS))
+        
         html_path = self.generate_html_report()
         
         print("\n" + "="*60)
@@ -469,12 +631,13 @@ class RAGASVisualizer:
         print(f"\n📂 Visualizations saved in: {self.viz_dir}")
         print(f"📄 Open HTML report: {html_path}")
         print("\n")
+        return html_path
 
 
-def main(results_file: str = None):
+def main(results_file: str = None, serial: bool = False, force: bool = False):
     """Main execution function"""
     visualizer = RAGASVisualizer(results_file)
-    visualizer.generate_all_visualizations()
+    visualizer.generate_all_visualizations(serial=serial, force=force)
 
 
 if __name__ == "__main__":
@@ -483,7 +646,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate visualizations from RAGAS results")
     parser.add_argument("--results-file", type=str, default=None, 
                        help="Path to RAGAS results JSON (uses latest if not specified)")
+    parser.add_argument("--serial", action="store_true",
+                       help="Generate plots in a single process instead of a process pool")
+    parser.add_argument("--force", action="store_true",
+                       help="Regenerate plots even if they are newer than the results file")
     
     args = parser.parse_args()
     
-    main(results_file=args.results_file)
+    main(results_file=args.results_file, serial=args.serial, force=args.force)